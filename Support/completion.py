@@ -13,33 +13,30 @@ support_path = env['TM_BUNDLE_SUPPORT']
 sys.path.insert(0, support_path)
 from textmate import dialog, tm_query, plist, exit_codes
 
-sys.path.insert(0, support_path + b'/jedi')
-import jedi
-jedi.settings.case_insensitive_completion = False
-jedi.settings.add_bracket_after_function = True
+import jedi_server
 
 
-def get_script():
-    """ Get the Jedi script object from the source passed on stdin, or none"""
-    source = ''.join(sys.stdin.readlines()) or None
-    script = None
+def request(command):
+    """ Forward the source passed on stdin and the cursor position to the jedi
+    server and return its result, or None """
+    source = ''.join(sys.stdin.readlines())
     try:
         line = int(env['TM_LINE_NUMBER'])
         col = int(env['TM_COLUMN_NUMBER']) - 1
         encoding = tm_query.query('encoding')
-        path = env('TM_FILE_PATH') if not source else None
-        script = jedi.Script(source, line, col, path, encoding=encoding)
+        try:
+            source = source.decode(encoding or 'utf-8', 'replace')
+        except (LookupError, AttributeError):
+            pass
     except (AttributeError, KeyError):
-        pass
-    return script
+        return None
+    return jedi_server.request(command, source, line, col,
+                               env.get('TM_FILE_PATH'))
 
 
 def get_completions():
     """ Retrieve completions from Jedi, or return an empty list """
-    script = get_script()
-    if script is None:
-        return []
-    return [s.name for s in script.completions()]
+    return request('completions') or []
 
 
 def show_completions():
@@ -56,37 +53,29 @@ def show_completions():
 
 def show_signature():
     """ Retrieve relevant function signatures and show them in a tooltip. """
-    script = get_script()
-    if script is None:
-        return
-    signatures = script.call_signatures()
+    signatures = request('call_signatures')
     text = []
     if signatures is not None:
         for s in signatures:
-            args = [p.get_code().replace('\n', '') for p in
-                        getattr(s, 'params', None) if p]
-            args = ", ".join(args)
+            args = ", ".join(s['params'])
             text.append("{call_name}({args})".format(
-                call_name=s.call_name, args=args))
+                call_name=s['call_name'], args=args))
     dialog.tooltip("\n".join(text))
 
 
 def goto_definition():
     """ Jump to the first defintion of the term under the cursor. """
-    script = get_script()
-    if script is None:
-        return
     try:
-        definitions = script.goto_definitions()
-    except jedi.NotFoundError:
+        definitions = request('goto_definitions')
+    except jedi_server.NotFoundError:
         exit_codes.exit_show_tool_tip('No definition found')
     if definitions:
         definition = definitions[0]
-        path = definition.module_path
-        if definition.in_builtin_module:
+        path = definition['module_path']
+        if definition['in_builtin_module']:
             exit_codes.exit_show_tool_tip('Cannot jump to builtin module')
-        line = str(definition.line or 1)
-        column = str(definition.column)
+        line = str(definition['line'] or 1)
+        column = str(definition['column'])
         #mate = env['TM_SUPPORT_PATH'] + b"/bin/mate"
         url = b"txmt://open/?url=file://{path}&line={line}&column={column}".format(
             path=path, line=line, column=column)
@@ -94,9 +83,6 @@ def goto_definition():
 
 
 def show_docstrings():
-    script = get_script()
-    if script is None:
-        return
     try:
 
         def hex_to_rgba(value):
@@ -111,9 +97,9 @@ def show_docstrings():
                     value[6:], 16) / 255.0,)
             return "rgba({0}, {1}, {2}, {3:.1f})".format(*result)
 
-        definitions = script.goto_definitions()
-        docs = ['<b>Docstring for %s</b></br>%s</br>%s' % (d.desc_with_module,
-            '='*40, d.doc) if d.doc else '|No Docstring for %s|' % d
+        definitions = request('docstrings') or []
+        docs = ['<b>Docstring for %s</b></br>%s</br>%s' % (d['desc_with_module'],
+            '='*40, d['doc']) if d['doc'] else '|No Docstring for %s|' % d['repr']
                  for d in definitions]
         contents = ('\n' + '-' * 79 + '\n').join(docs)
 
@@ -210,5 +196,5 @@ def show_docstrings():
         dialog.tooltip(html, format='html', transparent=True)
         exit_codes.exit_discard()
 
-    except jedi.NotFoundError:
+    except jedi_server.NotFoundError:
         dialog.tooltip('No documentation found')
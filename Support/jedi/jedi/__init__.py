@@ -37,5 +37,6 @@ good text editor, while still having very good IDE features for Python.
 __version__ = '0.8.0-alpha1'
 
 from jedi.api import Script, Interpreter, NotFoundError, set_debug_function
+from jedi.api import Cancelled, CancellationToken
 from jedi.api import preload_module, defined_names
 from jedi import settings
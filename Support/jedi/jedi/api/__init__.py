@@ -23,6 +23,7 @@ from jedi import debug
 from jedi import settings
 from jedi import common
 from jedi import cache
+from jedi.common import Cancelled, CancellationToken
 from jedi.api import keywords
 from jedi.api import classes
 from jedi.api import interpreter
@@ -68,9 +69,13 @@ class Script(object):
     :param source_encoding: The encoding of ``source``, if it is not a
         ``unicode`` object (default ``'utf-8'``).
     :type encoding: str
+    :param cancellation: Cancels the requests of this script, they raise
+        :exc:`Cancelled` then.
+    :type cancellation: :class:`CancellationToken`
     """
     def __init__(self, source=None, line=None, column=None, path=None,
-                 encoding='utf-8', source_path=None, source_encoding=None):
+                 encoding='utf-8', source_path=None, source_encoding=None,
+                 cancellation=None):
         if source_path is not None:
             warnings.warn("Use path instead of source_path.", DeprecationWarning)
             path = source_path
@@ -103,7 +108,12 @@ class Script(object):
         self.source = common.source_to_unicode(source, encoding)
         self._user_context = UserContext(self.source, self._pos)
         self._parser = UserContextParser(self.source, path, self._pos, self._user_context)
-        self._evaluator = Evaluator()
+        if settings.persistent_evaluator_cache:
+            self._evaluator = Evaluator.persistent()
+        else:
+            self._evaluator = Evaluator()
+        if cancellation is not None:
+            self._evaluator.cancellation = cancellation
         debug.speed('init')
 
     @property
@@ -119,11 +129,14 @@ class Script(object):
     def __repr__(self):
         return '<%s: %s>' % (self.__class__.__name__, repr(self._orig_path))
 
-    def completions(self):
+    def completions(self, timeout=None):
         """
         Return :class:`classes.Completion` objects. Those objects contain
         information about the completions, more than just names.
 
+        :param timeout: Seconds after which the evaluation stops. The
+            completions that have been found until then are returned.
+        :type timeout: float
         :return: Completion objects, sorted by name and __ comes last.
         :rtype: list of :class:`classes.Completion`
         """
@@ -155,25 +168,26 @@ class Script(object):
 
         user_stmt = self._parser.user_stmt_with_whitespace()
         b = compiled.builtin
-        completions = get_completions(user_stmt, b)
-
-        if not dot:
-            # add named params
-            for call_sig in self.call_signatures():
-                # allow protected access, because it's a public API.
-                module = call_sig._definition.get_parent_until()
-                # Compiled modules typically don't allow keyword arguments.
-                if not isinstance(module, compiled.CompiledObject):
-                    for p in call_sig.params:
-                        # Allow access on _definition here, because it's a
-                        # public API and we don't want to make the internal
-                        # Name object public.
-                        if p._definition.stars == 0:  # no *args/**kwargs
-                            completions.append((p._definition.get_name(), p))
-
-            if not path and not isinstance(user_stmt, pr.Import):
-                # add keywords
-                completions += ((k, b) for k in keywords.keyword_names(all=True))
+        with self._evaluator.time_budget(timeout):
+            completions = get_completions(user_stmt, b)
+
+            if not dot:
+                # add named params
+                for call_sig in self.call_signatures():
+                    # allow protected access, because it's a public API.
+                    module = call_sig._definition.get_parent_until()
+                    # Compiled modules typically don't allow keyword arguments.
+                    if not isinstance(module, compiled.CompiledObject):
+                        for p in call_sig.params:
+                            # Allow access on _definition here, because it's a
+                            # public API and we don't want to make the internal
+                            # Name object public.
+                            if p._definition.stars == 0:  # no *args/**kwargs
+                                completions.append((p._definition.get_name(), p))
+
+                if not path and not isinstance(user_stmt, pr.Import):
+                    # add keywords
+                    completions += ((k, b) for k in keywords.keyword_names(all=True))
 
         needs_dot = not dot and path
 
@@ -509,36 +523,37 @@ class Script(object):
         """
         temp, settings.dynamic_flow_information = \
             settings.dynamic_flow_information, False
-        user_stmt = self._parser.user_stmt()
-        definitions, search_name = self._goto(add_import_name=True)
-        if isinstance(user_stmt, pr.Statement):
-            c = user_stmt.expression_list()[0]
-            if not isinstance(c, unicode) and self._pos < c.start_pos:
-                # the search_name might be before `=`
-                definitions = [v for v in user_stmt.get_defined_names()
-                               if unicode(v.names[-1]) == search_name]
-        if not isinstance(user_stmt, pr.Import):
-            # import case is looked at with add_import_name option
-            definitions = usages.usages_add_import_modules(self._evaluator, definitions, search_name)
-
-        module = set([d.get_parent_until() for d in definitions])
-        module.add(self._parser.module())
-        names = usages.usages(self._evaluator, definitions, search_name, module)
-
-        for d in set(definitions):
-            if isinstance(d, (pr.Module, compiled.CompiledObject)):
-                names.append(classes.Definition(self._evaluator, d))
-            elif isinstance(d, er.Instance):
-                # Instances can be ignored, because they have been created by
-                # ``__getattr__``.
-                pass
-            else:
-                names.append(classes.Definition(self._evaluator, d.names[-1]))
-
-        settings.dynamic_flow_information = temp
+        try:
+            user_stmt = self._parser.user_stmt()
+            definitions, search_name = self._goto(add_import_name=True)
+            if isinstance(user_stmt, pr.Statement):
+                c = user_stmt.expression_list()[0]
+                if not isinstance(c, unicode) and self._pos < c.start_pos:
+                    # the search_name might be before `=`
+                    definitions = [v for v in user_stmt.get_defined_names()
+                                   if unicode(v.names[-1]) == search_name]
+            if not isinstance(user_stmt, pr.Import):
+                # import case is looked at with add_import_name option
+                definitions = usages.usages_add_import_modules(self._evaluator, definitions, search_name)
+
+            module = set([d.get_parent_until() for d in definitions])
+            module.add(self._parser.module())
+            names = usages.usages(self._evaluator, definitions, search_name, module)
+
+            for d in set(definitions):
+                if isinstance(d, (pr.Module, compiled.CompiledObject)):
+                    names.append(classes.Definition(self._evaluator, d))
+                elif isinstance(d, er.Instance):
+                    # Instances can be ignored, because they have been created by
+                    # ``__getattr__``.
+                    pass
+                else:
+                    names.append(classes.Definition(self._evaluator, d.names[-1]))
+        finally:
+            settings.dynamic_flow_information = temp
         return helpers.sorted_definitions(set(names))
 
-    def call_signatures(self):
+    def call_signatures(self, timeout=None):
         """
         Return the function object of the call you're currently in.
 
@@ -552,6 +567,9 @@ class Script(object):
 
         This would return ``None``.
 
+        :param timeout: Seconds after which the evaluation stops, like in
+            :meth:`completions`.
+        :type timeout: float
         :rtype: list of :class:`classes.CallSignature`
         """
         user_stmt = self._parser.user_stmt_with_whitespace()
@@ -559,7 +577,8 @@ class Script(object):
         if call is None:
             return []
 
-        with common.scale_speed_settings(settings.scale_call_signatures):
+        with common.scale_speed_settings(settings.scale_call_signatures), \
+                self._evaluator.time_budget(timeout):
             _callable = lambda: self._evaluator.eval_call(call)
             origins = cache.cache_call_signatures(_callable, self.source,
                                                   self._pos, user_stmt)
@@ -142,6 +142,11 @@ class BaseDefinition(object):
             stripped = stripped.parent
         if isinstance(stripped, pr.Name):
             stripped = stripped.parent
+        if isinstance(stripped, pr.SubModule):
+            # Library modules aren't parsed with the fast parser.
+            return 'module'
+        if isinstance(stripped, pr.LazyFunction):
+            return 'function'
         return type(stripped).__name__.lower()
 
     def _path(self):
@@ -59,7 +59,7 @@ def usages(evaluator, definitions, search_name, mods):
     compare_definitions = compare_array(definitions)
     mods |= set([d.get_parent_until() for d in definitions])
     names = []
-    for m in imports.get_modules_containing_name(mods, search_name):
+    for m in imports.get_modules_containing_name(evaluator, mods, search_name):
         try:
             stmts = m.used_names[search_name]
         except KeyError:
@@ -4,7 +4,10 @@ nothing really spectacular, just some decorators. The following cache types are
 available:
 
 - module caching (`load_parser` and `save_parser`), which uses pickle and is
-  really important to assure low load times of modules like ``numpy``.
+  really important to assure low load times of modules like ``numpy``. All
+  the pickles live in one memory mapped file, see `ParserPickling`.
+- descriptions of compiled modules are kept the same way, see
+  `CompiledSnapshots`.
 - ``time_cache`` can be used to cache something for just a limited time span,
   which can be useful if there's user interaction and the user cannot react
   faster than a certain time.
@@ -16,16 +19,25 @@ these variables are being cleaned after every API usage.
 import time
 import os
 import sys
-import json
-import hashlib
 import gc
+import json
 import inspect
 import shutil
 import re
+import mmap
+import struct
+import contextlib
+import itertools
+import collections
 try:
     import cPickle as pickle
 except ImportError:
     import pickle
+try:
+    import fcntl
+except ImportError:
+    # Windows, writes are not locked.
+    fcntl = None
 
 from jedi import settings
 from jedi import common
@@ -37,14 +49,24 @@ _star_import_cache = {}
 
 # for fast_parser, should not be deleted
 parser_cache = {}
+_parser_cache_size = 0
+_parser_cache_ticks = itertools.count()
+# The directory of the module the user is working on.
+_current_directory = None
+# Functions that are called with the path (or name) of a module, if its parser
+# is replaced or removed from `parser_cache`.
+parser_cache_listeners = []
 
 
 class ParserCacheItem(object):
-    def __init__(self, parser, change_time=None):
+    def __init__(self, parser, change_time=None, pinned=False):
         self.parser = parser
         if change_time is None:
             change_time = time.time()
         self.change_time = change_time
+        self.pinned = pinned
+        self.last_used = 0
+        self.size = 0
 
 
 def clear_caches(delete_all=False):
@@ -54,12 +76,15 @@ def clear_caches(delete_all=False):
     :param delete_all: Deletes also the cache that is normally not deleted,
         like parser cache, which is important for faster parsing.
     """
-    global _time_caches
+    global _time_caches, _parser_cache_size
 
     if delete_all:
         _time_caches = []
         _star_import_cache.clear()
+        for name in list(parser_cache):
+            _notify_parser_cache_listeners(name)
         parser_cache.clear()
+        _parser_cache_size = 0
     else:
         # normally just kill the expired entries, not all
         for tc in _time_caches:
@@ -163,36 +188,66 @@ def memoize(func):
 
 
 def cache_star_import(func):
+    """
+    Caches the modules that a module star imports (recursively). They are
+    valid until the module or one of these modules is parsed again, see
+    `_invalidate_star_import_cache_path`, or until one of these modules
+    changes on disk.
+    """
     def wrapper(evaluator, scope, *args, **kwargs):
-        with common.ignored(KeyError):
-            mods = _star_import_cache[scope]
-            if mods[0] + settings.star_import_cache_validity > time.time():
-                return mods[1]
-        # cache is too old and therefore invalid or not available
-        _invalidate_star_import_cache_module(scope)
+        try:
+            mods, change_times = _star_import_cache[scope]
+        except KeyError:
+            pass
+        else:
+            if not _star_imports_changed(change_times):
+                return mods
+            del _star_import_cache[scope]
         mods = func(evaluator, scope, *args, **kwargs)
-        _star_import_cache[scope] = time.time(), mods
-
+        change_times = []
+        for m in mods:
+            path = getattr(m, 'path', None)
+            if path:
+                with common.ignored(OSError):
+                    change_times.append((path, os.path.getmtime(path)))
+        _star_import_cache[scope] = mods, change_times
         return mods
     return wrapper
 
 
-def _invalidate_star_import_cache_module(module, only_main=False):
+def _star_imports_changed(change_times):
+    """ Checks if one of the star imported modules has been modified. """
+    for path, change_time in change_times:
+        try:
+            if os.path.getmtime(path) != change_time:
+                return True
+        except OSError:
+            return True
+    return False
+
+
+def _invalidate_star_import_cache_module(module):
     """ Important if some new modules are being reparsed """
-    with common.ignored(KeyError):
-        t, mods = _star_import_cache[module]
+    _star_import_cache.pop(module, None)
+    # We need a list here because otherwise the list is being changed
+    # during the iteration in py3k: iteritems -> items.
+    for key, (mods, change_times) in list(_star_import_cache.items()):
+        if module in mods:
+            del _star_import_cache[key]
 
-        del _star_import_cache[module]
 
-        for m in mods:
-            _invalidate_star_import_cache_module(m, only_main=True)
+def _invalidate_star_import_cache_path(path):
+    """ Removes the star imports that use the module at ``path``. """
+    if path is None:
+        # Modules without a path are invalidated by `user_context`.
+        return
+    for key, (mods, change_times) in list(_star_import_cache.items()):
+        if getattr(key, 'path', None) == path \
+                or any(getattr(m, 'path', None) == path for m in mods):
+            del _star_import_cache[key]
 
-    if not only_main:
-        # We need a list here because otherwise the list is being changed
-        # during the iteration in py3k: iteritems -> items.
-        for key, (t, mods) in list(_star_import_cache.items()):
-            if module in mods:
-                _invalidate_star_import_cache_module(key)
+
+parser_cache_listeners.append(_invalidate_star_import_cache_path)
 
 
 def invalidate_star_import_cache(path):
@@ -218,6 +273,7 @@ def load_parser(path, name):
     try:
         parser_cache_item = parser_cache[n]
         if not path or p_time <= parser_cache_item.change_time:
+            parser_cache_item.last_used = next(_parser_cache_ticks)
             return parser_cache_item.parser
         else:
             # In case there is already a module cached and this module
@@ -237,29 +293,113 @@ def save_parser(path, name, parser, pickling=True):
         pickling = False
 
     n = name if path is None else path
-    item = ParserCacheItem(parser, p_time)
-    parser_cache[n] = item
+    # Modules that are not pickled are the ones that the user is working on,
+    # the last one is pinned in the parser cache.
+    item = ParserCacheItem(parser, p_time, pinned=not pickling)
     if settings.use_filesystem_cache and pickling:
         ParserPickling.save_parser(n, item)
+        if path is not None:
+            NamesIndex.save_module(path, parser.module)
+    _add_parser_cache_item(n, item)
 
 
-class ParserPickling(object):
+def remove_old_modules():
+    """
+    Removes old modules from the files of the filesystem cache, see
+    `settings.filesystem_cache_max_age` and
+    `settings.filesystem_cache_max_size`. This checks every module and may
+    rewrite the files, so it should be called when nobody waits for |jedi|.
+    """
+    if settings.use_filesystem_cache:
+        for record_file in ParserPickling, NamesIndex, CompiledSnapshots:
+            record_file._remove_old_modules()
+
 
-    version = 10
+def _add_parser_cache_item(name, item):
+    global _parser_cache_size, _current_directory
+    try:
+        item.size = item.parser.module.end_pos[0] or 0
+    except AttributeError:
+        item.size = 0
+    item.last_used = next(_parser_cache_ticks)
+    if item.pinned and name is not None:
+        _current_directory = os.path.dirname(name)
+
+    with common.ignored(KeyError):
+        _parser_cache_size -= parser_cache[name].size
+    _notify_parser_cache_listeners(name)
+    parser_cache[name] = item
+    _parser_cache_size += item.size
+    if settings.parser_cache_size is not None \
+            and _parser_cache_size > settings.parser_cache_size:
+        _shrink_parser_cache()
+
+
+def _shrink_parser_cache():
     """
-    Version number (integer) for file system cache.
+    Removes the least recently used modules until the parser cache uses
+    less than 80% of `settings.parser_cache_size`, so that this doesn't
+    happen on every save. The module the user is working on (the last one
+    saved with ``pinned``) and the modules next to it are kept, modules the
+    user worked on before are removed like all the others. Removed modules
+    are loaded again from `ParserPickling` or parsed again.
+    """
+    global _parser_cache_size
+    # Count again, the cache might have been changed without
+    # `_add_parser_cache_item`.
+    _parser_cache_size = sum(i.size for i in parser_cache.values())
+    limit = settings.parser_cache_size * 0.8
 
-    Increment this number when there are any incompatible changes in
-    parser representation classes.  For example, the following changes
-    are regarded as incompatible.
+    def pinned(name):
+        return name is not None \
+            and os.path.dirname(name) == _current_directory
 
-    - Class name is changed.
-    - Class is moved to another module.
-    - Defined slot of the class is changed.
+    candidates = [(i.last_used, n) for n, i in parser_cache.items()
+                  if not pinned(n)]
+    for _, name in sorted(candidates, key=lambda c: c[0]):
+        if _parser_cache_size <= limit:
+            break
+        _parser_cache_size -= parser_cache.pop(name).size
+        _notify_parser_cache_listeners(name)
+        debug.dbg('parser cache: removed %s', name)
+
+
+def _notify_parser_cache_listeners(name):
+    for listener in parser_cache_listeners:
+        listener(name)
+
+
+class _RecordFile(object):
+    """
+    A file in the cache directory that maps paths of modules to data. The
+    data is only valid as long as the size of the module doesn't change.
     """
+    version = 1
 
-    def __init__(self):
-        self.__index = None
+    _magic = b'JEDI'
+    _header = struct.Struct('<4sI')
+    _record = struct.Struct('<IdddQ')
+    """
+    All modules are stored in one append-only file. It starts with
+    `_header` (magic and `version`), followed by the records. Each record
+    is a `_record` (length of the path, change time and size of the
+    module, time of saving, length of the data) followed by the utf-8
+    encoded path and the data. A record without data removes the module
+    from the cache.
+
+    The offset table is built by reading just the record headers, so only
+    the data that is actually used is read from the memory mapped file.
+    Writes append whole records while holding a lock on the file.
+    """
+
+    _min_compact_size = 2 ** 20
+    """
+    Superseded records are removed by rewriting the file, as soon as they
+    use more than half of it and at least this many bytes.
+    """
+
+    def __init__(self, file_name):
+        self._file_name = file_name
         self.py_tag = 'cpython-%s%s' % sys.version_info[:2]
         """
         Short name for distinguish Python implementations and versions.
@@ -270,87 +410,407 @@ class ParserPickling(object):
 
         .. todo:: Detect interpreter (e.g., PyPy).
         """
+        self._close()
 
-    def load_parser(self, path, original_changed_time):
+    def clear_cache(self):
+        self._close()
+        shutil.rmtree(self._cache_directory())
+
+    def _pack_record(self, path, change_time, size, data):
+        path = path.encode('utf-8')
+        return self._record.pack(len(path), change_time, size, time.time(),
+                                 len(data)) + path + data
+
+    def _module_size(self, path):
+        """ Sizes are only checked for real files, not for builtin modules. """
+        try:
+            return float(os.path.getsize(path))
+        except OSError:
+            return -1.0
+
+    def _close(self):
+        self._file_path = None
+        self._file_id = None
+        self._mmap = None
+        self._scanned = 0
+        self._index = {}
+        self._dead = 0
+
+    def _refresh(self):
+        """
+        Makes sure that the offset table knows all the records in the file.
+        Only records that have been appended since the last call are read.
+        """
+        file_path = self._get_path(self._file_name)
         try:
-            pickle_changed_time = self._index[path]
+            stat = os.stat(file_path)
+        except OSError:
+            self._close()
+            return
+        file_id = stat.st_dev, stat.st_ino
+        if file_path != self._file_path or file_id != self._file_id \
+                or stat.st_size < self._scanned:
+            # The cache directory was changed or the file was replaced.
+            self._close()
+            self._file_path = file_path
+            self._file_id = file_id
+        if stat.st_size == self._scanned \
+                or stat.st_size < self._header.size:
+            return
+
+        with open(file_path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if not self._scanned:
+            magic, version = self._header.unpack_from(self._mmap, 0)
+            if magic != self._magic or version != self.version:
+                # Incompatible cache, the next write starts a new one.
+                self._mmap = None
+                return
+            self._scanned = self._header.size
+        self._scan()
+
+    def _scan(self):
+        mm = self._mmap
+        index = self._index
+        pos = self._scanned
+        end = len(mm)
+        while pos + self._record.size <= end:
+            path_len, change_time, size, saved, length = \
+                self._record.unpack_from(mm, pos)
+            offset = pos + self._record.size + path_len
+            if offset + length > end:
+                # Not written completely, yet.
+                break
+            path = mm[pos + self._record.size:offset].decode('utf-8')
+            if path in index:
+                old = index[path]
+                self._dead += old.end - old.start
+            if length:
+                index[path] = _Record(pos, offset, offset + length,
+                                      change_time, size, saved)
+            else:
+                index.pop(path, None)
+                self._dead += offset - pos
+            pos = offset + length
+        self._scanned = pos
+
+    @contextlib.contextmanager
+    def _locked(self):
+        """
+        Opens the cache file for appending. Only one process at a time can
+        write to it.
+        """
+        file_path = self._get_path(self._file_name)
+        while True:
+            f = open(file_path, 'ab')
+            if fcntl is None:
+                break
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            stat = os.fstat(f.fileno())
+            try:
+                current = os.stat(file_path)
+            except OSError:
+                current = None
+            if current is not None and (stat.st_dev, stat.st_ino) \
+                    == (current.st_dev, current.st_ino):
+                break
+            # Another process replaced the file (see `_compact`) while we
+            # were waiting for the lock, records written to the old one
+            # would be lost.
+            f.close()
+        try:
+            # Get the records of other processes and remove the rest of
+            # writes that have been interrupted.
+            self._refresh()
+            if not self._scanned:
+                f.truncate(0)
+                f.write(self._header.pack(self._magic, self.version))
+            elif os.fstat(f.fileno()).st_size > self._scanned:
+                f.truncate(self._scanned)
+            yield f
+            f.flush()
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            f.close()
+
+    def _save(self, path, change_time, data):
+        self._append([self._pack_record(path, change_time,
+                                        self._module_size(path), data)])
+
+    def _load(self, path):
+        """ Returns the record of ``path`` if the module didn't change. """
+        self._refresh()
+        try:
+            record = self._index[path]
         except KeyError:
             return None
+        if record.size != self._module_size(path):
+            return None
+        return record
+
+    def _append(self, records):
+        with self._locked() as f:
+            f.write(b''.join(records))
+        self._refresh()
+        if self._dead > self._min_compact_size \
+                and self._dead * 2 > len(self._mmap):
+            self._compact()
+
+    def _compact(self, remove=()):
+        """
+        Rewrites the file without the superseded records and without the
+        modules in ``remove``.
+        """
+        file_path = self._get_path(self._file_name)
+        with self._locked():
+            temp_path = file_path + '.tmp'
+            with open(temp_path, 'wb') as f:
+                f.write(self._header.pack(self._magic, self.version))
+                for path, record in self._index.items():
+                    if path not in remove:
+                        f.write(self._mmap[record.start:record.end])
+            _replace(temp_path, file_path)
+        self._close()
+        self._refresh()
+
+    def _remove_old_modules(self):
+        """
+        Removes modules whose files have been deleted or changed since they
+        were saved, modules that haven't been saved for
+        `settings.filesystem_cache_max_age` and the oldest modules if the
+        cache is bigger than `settings.filesystem_cache_max_size`.
+        """
+        self._refresh()
+        now = time.time()
+        remove = set()
+        for path, record in self._index.items():
+            if record.size >= 0:
+                try:
+                    if os.path.getmtime(path) > record.change_time:
+                        remove.add(path)
+                except OSError:
+                    remove.add(path)
+            if now - record.saved > settings.filesystem_cache_max_age:
+                remove.add(path)
+
+        size = self._header.size
+        by_age = sorted(self._index.items(), key=lambda r: -r[1].saved)
+        for path, record in by_age:
+            if path not in remove:
+                size += record.end - record.start
+                if size > settings.filesystem_cache_max_size:
+                    remove.add(path)
+
+        if remove or self._dead:
+            debug.dbg('pickle: removing %s old modules', len(remove))
+            self._compact(remove)
+
+    def _get_path(self, file):
+        dir = self._cache_directory()
+        if not os.path.exists(dir):
+            os.makedirs(dir)
+        return os.path.join(dir, file)
+
+    def _cache_directory(self):
+        return os.path.join(settings.cache_directory, self.py_tag)
+
+
+class ParserPickling(_RecordFile):
+
+    version = 17
+    """
+    Version number (integer) for file system cache.
+
+    Increment this number when there are any incompatible changes in
+    parser representation classes.  For example, the following changes
+    are regarded as incompatible.
+
+    - Class name is changed.
+    - Class is moved to another module.
+    - Defined slot of the class is changed.
+    """
+
+    def __init__(self):
+        _RecordFile.__init__(self, 'parsers.cache')
+
+    def load_parser(self, path, original_changed_time):
+        record = self._load(path)
+        if record is None:
+            return None
         if original_changed_time is not None \
-                and pickle_changed_time < original_changed_time:
+                and record.change_time < original_changed_time:
             # the pickle file is outdated
             return None
 
-        with open(self._get_hashed_path(path), 'rb') as f:
-            try:
-                gc.disable()
-                parser_cache_item = pickle.load(f)
-            finally:
-                gc.enable()
+        data = self._mmap[record.offset:record.end]
+        try:
+            gc.disable()
+            parser_cache_item = pickle.loads(data)
+        finally:
+            gc.enable()
 
         debug.dbg('pickle loaded: %s', path)
-        parser_cache[path] = parser_cache_item
+        _add_parser_cache_item(path, parser_cache_item)
         return parser_cache_item.parser
 
     def save_parser(self, path, parser_cache_item):
-        self.__index = None
-        try:
-            files = self._index
-        except KeyError:
-            files = {}
-            self._index = files
+        data = pickle.dumps(parser_cache_item, pickle.HIGHEST_PROTOCOL)
+        self._save(path, parser_cache_item.change_time, data)
+
+    def _remove_old_modules(self):
+        """ Also removes the files of older cache formats. """
+        with common.ignored(OSError):
+            for f in os.listdir(self._cache_directory()):
+                if f.endswith('.pkl') or f == 'index.json':
+                    os.remove(os.path.join(self._cache_directory(), f))
+        _RecordFile._remove_old_modules(self)
+
+
+class NamesIndex(_RecordFile):
+    """
+    Knows the names used in modules, so that searching modules for a name
+    doesn't need to read and parse all of them. A record holds the names of
+    a module, the used names if it's parsed (see `save_module`), all of its
+    words if it's just read (see `save_sources`).
 
-        with open(self._get_hashed_path(path), 'wb') as f:
-            pickle.dump(parser_cache_item, f, pickle.HIGHEST_PROTOCOL)
-            files[path] = parser_cache_item.change_time
+    The records are inverted into name -> modules in memory, only records
+    that have been appended since the last search are read.
+    """
 
-        self._flush_index()
+    version = 2
 
-    @property
-    def _index(self):
-        if self.__index is None:
+    def __init__(self):
+        _RecordFile.__init__(self, 'names.cache')
+
+    def modules_using(self, name, paths):
+        """
+        Returns the modules of ``paths`` that use ``name`` and the ones that
+        are not known or changed since they were saved.
+        """
+        self._refresh()
+        self._invert()
+        users = self._users.get(name, ())
+        result = []
+        for path in paths:
+            record = self._index.get(path)
+            if record is None or path in users:
+                result.append(path)
+                continue
             try:
-                with open(self._get_path('index.json')) as f:
-                    data = json.load(f)
-            except (IOError, ValueError):
-                self.__index = {}
-            else:
-                # 0 means version is not defined (= always delete cache):
-                if data.get('version', 0) != self.version:
-                    self.clear_cache()
-                    self.__index = {}
-                else:
-                    self.__index = data['index']
-        return self.__index
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if stat.st_mtime != record.change_time \
+                    or float(stat.st_size) != record.size:
+                result.append(path)
+        return result
+
+    def save_module(self, path, module):
+        """ Saves the used names of a parsed module. """
+        names = set(module.used_names)
+        # Names in function bodies that haven't been parsed, yet.
+        names.update(getattr(module.used_names, 'lazy', ()))
+        record = self._names_record(path, names)
+        if record is not None:
+            self._append([record])
+
+    def save_sources(self, sources):
+        """
+        Saves all the words of modules that have been read, but not parsed,
+        as ``(path, source)`` tuples. They are appended at once.
+        """
+        records = [self._names_record(path, re.findall(r'\w+', source))
+                   for path, source in sources]
+        records = [r for r in records if r is not None]
+        if records:
+            self._append(records)
 
-    def _remove_old_modules(self):
-        # TODO use
-        change = False
-        if change:
-            self._flush_index(self)
-            self._index  # reload index
-
-    def _flush_index(self):
-        data = {'version': self.version, 'index': self._index}
-        with open(self._get_path('index.json'), 'w') as f:
-            json.dump(data, f)
-        self.__index = None
+    def _names_record(self, path, names):
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return None
+        data = json.dumps(sorted(set(names))).encode('utf-8')
+        return self._pack_record(path, mtime, self._module_size(path), data)
+
+    def _invert(self):
+        if self._inverted == self._scanned:
+            return
+        for path, record in self._index.items():
+            start, names = self._names.get(path, (None, ()))
+            if start == record.start:
+                continue
+            for n in names:
+                self._users[n].discard(path)
+            data = self._mmap[record.offset:record.end]
+            names = json.loads(data.decode('utf-8'))
+            self._names[path] = record.start, names
+            for n in names:
+                self._users.setdefault(n, set()).add(path)
+        self._inverted = self._scanned
+
+    def _close(self):
+        _RecordFile._close(self)
+        # path -> (start of its record, names)
+        self._names = {}
+        # name -> paths
+        self._users = {}
+        self._inverted = 0
+
+
+class CompiledSnapshots(_RecordFile):
+    """
+    Descriptions of compiled modules (see
+    `jedi.evaluate.compiled.introspection`), so that the next process doesn't
+    need to import them again. Modules without a file (builtin modules) are
+    valid as long as the interpreter doesn't change.
+    """
 
-    def clear_cache(self):
-        shutil.rmtree(self._cache_directory())
+    # Increase it if the descriptions change, the old ones are ignored then.
+    version = 2
 
-    def _get_hashed_path(self, path):
-        return self._get_path('%s.pkl' % hashlib.md5(path.encode("utf-8")).hexdigest())
+    def __init__(self):
+        _RecordFile.__init__(self, 'compiled.cache')
 
-    def _get_path(self, file):
-        dir = self._cache_directory()
-        if not os.path.exists(dir):
-            os.makedirs(dir)
-        return os.path.join(dir, file)
+    def _change_time(self, path):
+        try:
+            return os.path.getmtime(path or sys.executable)
+        except OSError:
+            return None
 
-    def _cache_directory(self):
-        return os.path.join(settings.cache_directory, self.py_tag)
+    def load_description(self, path, name):
+        n = name if path is None else path
+        record = self._load(n)
+        if record is None or record.change_time != self._change_time(path):
+            return None
+        debug.dbg('compiled snapshot loaded: %s', n)
+        return pickle.loads(self._mmap[record.offset:record.end])
+
+    def save_description(self, path, name, description):
+        change_time = self._change_time(path)
+        if change_time is not None:
+            data = pickle.dumps(description, pickle.HIGHEST_PROTOCOL)
+            self._save(name if path is None else path, change_time, data)
+
+
+_Record = collections.namedtuple('_Record',
+                                 'start offset end change_time size saved')
+"""
+A module in the file of `ParserPickling`. The record is ``start:end``, the
+pickle ``offset:end``.
+"""
+
+
+def _replace(src, dst):
+    """ Atomically replaces ``dst`` (``os.rename`` doesn't on Windows). """
+    try:
+        os.replace(src, dst)
+    except AttributeError:
+        os.rename(src, dst)
 
 
-# is a singleton
+# are singletons
 ParserPickling = ParserPickling()
+NamesIndex = NamesIndex()
+CompiledSnapshots = CompiledSnapshots()
@@ -1,4 +1,5 @@
 """ A universal module with functions / classes without dependencies. """
+import atexit
 import sys
 import contextlib
 import functools
@@ -15,6 +16,30 @@ class MultiLevelStopIteration(Exception):
     """
 
 
+class Cancelled(Exception):
+    """
+    Raised by the methods of :class:`jedi.Script`, if the
+    :class:`CancellationToken` of the script has been cancelled.
+    """
+
+
+class CancellationToken(object):
+    """
+    Pass it to :class:`jedi.Script` and call :meth:`cancel` (e.g. from another
+    thread) to stop a request whose result isn't needed anymore. The request
+    raises :exc:`Cancelled` as soon as possible.
+    """
+    def __init__(self):
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def check(self):
+        if self.cancelled:
+            raise Cancelled()
+
+
 class UncaughtAttributeError(Exception):
     """
     Important, because `__getattr__` and `hasattr` catch AttributeErrors
@@ -86,15 +111,70 @@ class PushBackIterator(object):
         return self.current
 
 
+class ProcessPool(object):
+    """
+    A ``concurrent.futures.ProcessPoolExecutor`` that is started when it's
+    needed first and then shared by all the calls. ``size`` is a function
+    that returns the number of processes (a setting), the pool is started
+    again if it changes. :meth:`kill` stops workers that hang or crashed,
+    the next call starts new ones.
+    """
+    def __init__(self, size, initializer=None):
+        self._size = size
+        self._initializer = initializer
+        self._executor = None
+        self._executor_size = None
+        self._registered = False
+
+    def get(self):
+        """ Returns the executor, or None if processes are not available. """
+        size = self._size()
+        if self._executor is not None and self._executor_size != size:
+            self.shutdown()
+        if self._executor is None:
+            try:
+                from concurrent.futures import ProcessPoolExecutor
+                if self._initializer is None:
+                    self._executor = ProcessPoolExecutor(size)
+                else:
+                    self._executor = ProcessPoolExecutor(
+                        size, initializer=self._initializer)
+            except (OSError, ImportError, NotImplementedError):
+                # Python 2 or no working semaphores on this platform.
+                return None
+            self._executor_size = size
+            if not self._registered:
+                atexit.register(self.shutdown)
+                self._registered = True
+        return self._executor
+
+    def kill(self):
+        """ Terminates the workers, even if they are still working. """
+        executor = self._executor
+        if executor is not None:
+            # There's no public API for this before Python 3.14.
+            processes = getattr(executor, '_processes', None) or {}
+            for process in list(processes.values()):
+                process.terminate()
+        self.shutdown()
+
+    def shutdown(self):
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
 @contextlib.contextmanager
 def scale_speed_settings(factor):
     a = settings.max_executions
     b = settings.max_until_execution_unique
     settings.max_executions *= factor
     settings.max_until_execution_unique *= factor
-    yield
-    settings.max_executions = a
-    settings.max_until_execution_unique = b
+    try:
+        yield
+    finally:
+        settings.max_executions = a
+        settings.max_until_execution_unique = b
 
 
 def indent_block(text, indention='    '):
@@ -69,16 +69,20 @@ backtracking algorithm.
 .. todo:: nonlocal statement, needed or can be ignored? (py3k)
 """
 import itertools
+import contextlib
+import time
 
 from jedi._compatibility import next, hasattr, unicode
 from jedi.parser import representation as pr
 from jedi.parser.tokenize import Token
 from jedi import debug
+from jedi import common
+from jedi import settings
 from jedi.evaluate import representation as er
 from jedi.evaluate import imports
 from jedi.evaluate import recursion
 from jedi.evaluate import iterable
-from jedi.evaluate.cache import memoize_default
+from jedi.evaluate.cache import memoize_default, MemoizeCache, PersistentMemoizeCache
 from jedi.evaluate import stdlib
 from jedi.evaluate import finder
 from jedi.evaluate import compiled
@@ -86,12 +90,76 @@ from jedi.evaluate import precedence
 
 
 class Evaluator(object):
+    _persistent = None
+
     def __init__(self):
-        self.memoize_cache = {}  # for memoize decorators
+        # for memoize decorators
+        self.memoize_cache = MemoizeCache() if settings.memoize_statistics else {}
         self.import_cache = {}  # like `sys.modules`.
         self.compiled_cache = {}  # see `compiled.create()`
         self.recursion_detector = recursion.RecursionDetector()
         self.execution_recursion_detector = recursion.ExecutionRecursionDetector()
+        self.deadline = None
+        self.timed_out = False
+        self.cancellation = common.CancellationToken()
+
+    @classmethod
+    def persistent(cls):
+        """
+        Returns the evaluator that is used for all requests, if
+        :data:`jedi.settings.persistent_evaluator_cache` is True. Its results
+        are kept until the modules they depend on change, see
+        :class:`cache.PersistentMemoizeCache`. Everything else is reset.
+        """
+        evaluator = cls._persistent
+        if evaluator is None:
+            evaluator = cls._persistent = cls()
+            evaluator.memoize_cache = PersistentMemoizeCache()
+        else:
+            evaluator.memoize_cache.new_request()
+            # Imports depend on the module, recursions on the request.
+            evaluator.import_cache = {}
+            evaluator.recursion_detector = recursion.RecursionDetector()
+            evaluator.execution_recursion_detector = \
+                recursion.ExecutionRecursionDetector()
+            evaluator.cancellation = common.CancellationToken()
+        return evaluator
+
+    @contextlib.contextmanager
+    def time_budget(self, timeout):
+        """
+        Stops evaluating after ``timeout`` seconds, statements and executions
+        evaluated afterwards have no types. A budget that is already running
+        (e.g. ``call_signatures`` in ``completions``) is not extended.
+
+        The results that are calculated in the meantime are incomplete and
+        are deleted afterwards.
+        """
+        if timeout is None or self.deadline is not None:
+            yield
+            return
+        self.deadline = time.time() + timeout
+        try:
+            yield
+        finally:
+            self.deadline = None
+            if self.timed_out:
+                self.timed_out = False
+                if isinstance(self.memoize_cache, PersistentMemoizeCache):
+                    self.memoize_cache.new_request()
+                else:
+                    self.memoize_cache.clear()
+
+    def out_of_time(self):
+        """ True if the time budget of :meth:`time_budget` is used up. """
+        if self.deadline is None or time.time() < self.deadline:
+            return False
+        if not self.timed_out:
+            debug.warning('time budget used up')
+            self.timed_out = True
+        if isinstance(self.memoize_cache, PersistentMemoizeCache):
+            self.memoize_cache.depends_on_request()
+        return True
 
     def find_types(self, scope, name_str, position=None, search_global=False,
                    is_goto=False, resolve_decorator=True):
@@ -122,6 +190,7 @@ class Evaluator(object):
         :param stmt: A `pr.Statement`.
         """
         debug.dbg('eval_statement %s (%s)', stmt, seek_name)
+        self.cancellation.check()
         expression_list = stmt.expression_list()
 
         result = self.eval_expression_list(expression_list)
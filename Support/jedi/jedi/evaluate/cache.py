@@ -2,9 +2,14 @@
 - the popular ``memoize_default`` works like a typical memoize and returns the
   default otherwise.
 - ``CachedMetaClass`` uses ``memoize_default`` to do the same with classes.
+- ``MemoizeCache`` counts the hits and misses of ``memoize_default``.
+- ``PersistentMemoizeCache`` keeps the results of ``memoize_default`` for
+  more than one evaluator.
 """
+from jedi import cache as parser_cache
 
 NO_DEFAULT = object()
+_MISSING = object()
 
 
 def memoize_default(default=None, evaluator_is_first_arg=False, second_arg_is_evaluator=False):
@@ -27,17 +32,29 @@ def memoize_default(default=None, evaluator_is_first_arg=False, second_arg_is_ev
             try:
                 memo = cache[function]
             except KeyError:
-                memo = {}
-                cache[function] = memo
+                memo = cache[function] = {}
 
-            key = (obj, args, frozenset(kwargs.items()))
-            if key in memo:
-                return memo[key]
+            # No tuples and frozensets that aren't needed, this is called
+            # very often.
+            if kwargs:
+                key = obj, args, frozenset(kwargs.items())
+            elif args:
+                key = obj, args
             else:
-                if default is not NO_DEFAULT:
-                    memo[key] = default
-                rv = function(obj, *args, **kwargs)
-                memo[key] = rv
+                key = obj
+
+            rv = memo.get(key, _MISSING)
+            if type(cache) is dict:
+                if rv is _MISSING:
+                    if default is not NO_DEFAULT:
+                        memo[key] = default
+                    rv = memo[key] = function(obj, *args, **kwargs)
+                return rv
+            elif rv is _MISSING:
+                return cache.calculate(function, memo, key, default, obj,
+                                       args, kwargs)
+            else:
+                cache.used(function, memo, key)
                 return rv
         return wrapper
     return func
@@ -52,3 +69,158 @@ class CachedMetaClass(type):
     @memoize_default(None, second_arg_is_evaluator=True)
     def __call__(self, *args, **kwargs):
         return super(CachedMetaClass, self).__call__(*args, **kwargs)
+
+
+def _module_path(obj):
+    """ The path of the module of a parser object, compiled objects have none. """
+    try:
+        return obj._sub_module.path, True
+    except AttributeError:
+        return None, False
+
+
+class MemoizeCache(dict):
+    """
+    A ``memoize_cache`` that counts how often the results of the memoized
+    functions are used (hits) and calculated (misses), see
+    :data:`jedi.settings.memoize_statistics`.
+    """
+    def __init__(self):
+        super(MemoizeCache, self).__init__()
+        # function -> [hits, misses]
+        self.statistics = {}
+
+    def __missing__(self, function):
+        memo = self[function] = {}
+        return memo
+
+    def _count(self, function, index):
+        try:
+            self.statistics[function][index] += 1
+        except KeyError:
+            self.statistics[function] = [1 - index, index]
+
+    def used(self, function, memo, key):
+        """ A result is used again. """
+        self._count(function, 0)
+
+    def calculate(self, function, memo, key, default, obj, args, kwargs):
+        """ Calculates and stores a result. """
+        self._count(function, 1)
+        if default is not NO_DEFAULT:
+            memo[key] = default
+        rv = memo[key] = function(obj, *args, **kwargs)
+        return rv
+
+
+class PersistentMemoizeCache(MemoizeCache):
+    """
+    A ``memoize_cache`` for all evaluators, see
+    :data:`jedi.settings.persistent_evaluator_cache`.
+
+    Every result remembers the modules that have been used to calculate it,
+    i.e. the modules of the objects and arguments of the memoized calls
+    during the calculation. If one of these modules is parsed again (or
+    removed from the parser cache), the result is deleted. Results that
+    don't know any module (e.g. of api objects) or use modules without a
+    path are only kept until the next request.
+    """
+    _request = object()
+
+    def __init__(self):
+        super(PersistentMemoizeCache, self).__init__()
+        # The paths used by the calculations that are running.
+        self._stack = []
+        # path -> {(id(memo), key): memo}
+        self._dependents = {}
+        # (id(memo), key) -> paths
+        self._entries = {}
+        # id(obj) -> (obj, entry) for objects created by `CachedMetaClass`
+        self._objects = {}
+        # code -> function, to find functions that are defined again and again
+        self._functions = {}
+        self._request_functions = set()
+        parser_cache.parser_cache_listeners.append(self.invalidate)
+
+    def __missing__(self, function):
+        memo = super(PersistentMemoizeCache, self).__missing__(function)
+        code = getattr(function, '__code__', None)
+        if self._functions.setdefault(code, function) is not function:
+            # A function defined in a function. Its results are not found
+            # again with the next definition, keep them just for this request.
+            self._request_functions.add(function)
+        return memo
+
+    def _paths(self, key):
+        paths = set()
+        todo = [key]
+        while todo:
+            o = todo.pop()
+            if isinstance(o, tuple):
+                todo += o
+                continue
+            path, found = _module_path(o)
+            if found:
+                # Modules without a path (e.g. the statement under the
+                # cursor) are parsed again for every request.
+                paths.add(self._request if path is None else path)
+            # Objects of e.g. `er.Instance` depend on their arguments, too.
+            created, entry = self._objects.get(id(o), (None, None))
+            if created is o:
+                paths |= self._entries.get(entry, set())
+        return paths
+
+    def used(self, function, memo, key):
+        """ A result is used in the running calculation. """
+        self._count(function, 0)
+        if self._stack:
+            self._stack[-1] |= self._entries.get((id(memo), key), set())
+
+    def depends_on_request(self):
+        """ The running calculation is only valid for this request. """
+        if self._stack:
+            self._stack[-1].add(self._request)
+
+    def calculate(self, function, memo, key, default, obj, args, kwargs):
+        self._count(function, 1)
+        if default is not NO_DEFAULT:
+            memo[key] = default
+        self._stack.append(self._paths(key))
+        try:
+            rv = function(obj, *args, **kwargs)
+        except BaseException:
+            # Don't keep the default, e.g. after a `KeyboardInterrupt`.
+            memo.pop(key, None)
+            raise
+        finally:
+            paths = self._stack.pop()
+        if self._stack:
+            self._stack[-1] |= paths
+
+        memo[key] = rv
+        entry = id(memo), key
+        if not paths or function in self._request_functions:
+            paths = paths | set([self._request])
+        self._entries[entry] = paths
+        for path in self._entries[entry]:
+            self._dependents.setdefault(path, {})[entry] = memo
+        if isinstance(type(rv), CachedMetaClass):
+            self._objects[id(rv)] = rv, entry
+        return rv
+
+    def invalidate(self, path):
+        """ Deletes the results that have used the module at ``path``. """
+        for entry, memo in self._dependents.pop(path, {}).items():
+            rv = memo.pop(entry[1], None)
+            if self._objects.get(id(rv), (None, None))[1] == entry:
+                del self._objects[id(rv)]
+            for other in self._entries.pop(entry, ()):
+                if other != path:
+                    self._dependents.get(other, {}).pop(entry, None)
+
+    def new_request(self):
+        """ Deletes the results that are only valid for one request. """
+        self.invalidate(self._request)
+        for function in self._request_functions:
+            del self[function]
+        self._request_functions = set()
@@ -8,11 +8,13 @@ import os
 
 from jedi._compatibility import builtins as _builtins, unicode
 from jedi import debug
+from jedi import settings
 from jedi.cache import underscore_memoization, memoize
 from jedi.evaluate.sys_path import get_sys_path
 from jedi.parser.representation import Param, SubModule, Base, IsScope, Operator
 from jedi.evaluate.helpers import FakeName
 from . import fake
+from . import introspection
 
 
 class CompiledObject(Base):
@@ -51,6 +53,9 @@ class CompiledObject(Base):
 
     @underscore_memoization
     def _parse_function_doc(self):
+        obj, signature = introspection.signatures.get(id(self.obj), (None, None))
+        if obj is self.obj:
+            return signature
         if self.doc is None:
             return '', ''
 
@@ -201,6 +206,7 @@ class CompiledName(FakeName):
 
 
 def load_module(path, name):
+    file_path = path
     if not name:
         name = os.path.basename(path)
         name = name.rpartition('.')[0]  # cut file type (normally .so)
@@ -226,6 +232,12 @@ def load_module(path, name):
     if path:
         sys_path.insert(0, path)
 
+    if settings.compiled_introspection_processes:
+        module = introspection.load_module(file_path, name, dot_path[:-1],
+                                           sys_path)
+        if module is not None:
+            return CompiledObject(module)
+
     temp, sys.path = sys.path, sys_path
     try:
         module = __import__(name, {}, {}, dot_path[:-1])
@@ -8,10 +8,12 @@ import os
 import inspect
 
 from jedi._compatibility import is_py3, builtins, unicode
+from jedi import cache
 from jedi.parser import Parser
 from jedi.parser import tokenize
 from jedi.parser.representation import Class
 from jedi.evaluate.helpers import FakeName
+from jedi.evaluate.compiled import introspection
 
 modules = {}
 
@@ -25,13 +27,24 @@ def _load_faked_module(module):
         return modules[module_name]
     except KeyError:
         path = os.path.dirname(os.path.abspath(__file__))
+        path = os.path.join(path, 'fake', module_name) + '.pym'
+        # The parsed fake modules are pickled like other modules, they are
+        # parsed again if the `.pym` file changes.
         try:
-            with open(os.path.join(path, 'fake', module_name) + '.pym') as f:
-                source = f.read()
-        except IOError:
+            parser = cache.load_parser(path, None)
+        except OSError:
             modules[module_name] = None
             return
-        module = Parser(unicode(source), module_name).module
+        if parser is None:
+            try:
+                with open(path) as f:
+                    source = f.read()
+            except IOError:
+                modules[module_name] = None
+                return
+            parser = Parser(unicode(source), module_name)
+            cache.save_parser(path, None, parser)
+        module = parser.module
         modules[module_name] = module
 
         if module_name == 'builtins' and not is_py3:
@@ -64,7 +77,10 @@ def get_module(obj):
         # Unfortunately in some cases like `int` there's no __module__
         return builtins
     else:
-        return __import__(imp_plz)
+        try:
+            return introspection.modules[imp_plz]
+        except KeyError:
+            return __import__(imp_plz)
 
 
 def _faked(module, obj, name):
@@ -79,7 +95,7 @@ def _faked(module, obj, name):
     # Having the module as a `parser.representation.module`, we need to scan
     # for methods.
     if name is None:
-        if inspect.isbuiltin(obj):
+        if inspect.isbuiltin(obj) or introspection.is_builtin(obj):
             return search_scope(faked_mod, obj.__name__)
         elif not inspect.isclass(obj):
             # object is a method or descriptor
@@ -0,0 +1,332 @@
+"""
+Imports compiled modules (C extensions) in worker processes, see
+:data:`jedi.settings.compiled_introspection_processes`.
+
+A worker imports the module and describes everything that can be reached
+through its attributes: modules, classes, functions, instances and simple
+values (numbers, strings). The description is a list of picklable entries
+that reference each other by index. The |jedi| process builds imitations of
+these objects from it (``types.ModuleType`` objects, classes, method
+descriptors), so that ``CompiledObject`` can use ``dir``, ``getattr`` and
+``inspect`` on them like on the real objects - without importing the module.
+
+Classes of modules that the worker imported while it was started (like the
+|jedi| process it was started from) are only referenced by name and looked up
+in ``sys.modules`` of the |jedi| process.
+
+A worker that doesn't answer within
+:data:`jedi.settings.compiled_introspection_timeout` is killed.
+
+The signatures of functions and classes are parsed from their docstrings by
+the worker, too. Descriptions are saved in `jedi.cache.CompiledSnapshots`, a
+module is only imported again if its file changes.
+"""
+import inspect
+import sys
+import types
+
+from jedi._compatibility import builtins, unicode
+from jedi import cache
+from jedi import common
+from jedi import debug
+from jedi import settings
+
+# Attributes that are not used for completions, but confuse the import system.
+_IGNORED_MODULE_ATTRIBUTES = ('__getattr__', '__dir__', '__path__', '__spec__',
+                              '__loader__', '__builtins__')
+_VALUES = (int, float, complex, bool, str, bytes, unicode, type(None))
+
+modules = {}
+""" Module name -> imitation of the module, for ``fake.get_module``. """
+
+signatures = {}
+""" id(imitation) -> (imitation, parsed docstring), see `compiled._parse_function_doc`. """
+
+# Class -> {name: imitation} of dunder attributes, which cannot be set on the
+# class itself without changing its behaviour.
+_dunders = {}
+
+
+def load_module(path, name, fromlist, sys_path):
+    """
+    Returns an imitation of the module ``name`` (with the file ``path``),
+    imported with ``sys_path`` in a worker process, or None if there are no
+    workers. Raises ``ImportError`` like ``__import__``.
+    """
+    try:
+        return modules[name]
+    except KeyError:
+        pass
+
+    description = None
+    if settings.use_filesystem_cache:
+        description = cache.CompiledSnapshots.load_description(path, name)
+    if description is None:
+        executor = _pool.get()
+        if executor is None:
+            return None
+        try:
+            future = executor.submit(describe_module, name, fromlist, sys_path)
+            description = future.result(settings.compiled_introspection_timeout)
+        except ImportError:
+            raise
+        except Exception as e:
+            # The extension crashed or hangs (or isn't picklable). Never try
+            # it again, kill the worker, new ones are started for the other
+            # modules.
+            debug.warning('Importing %s in a worker failed: %r', name, e)
+            _pool.kill()
+        else:
+            if settings.use_filesystem_cache:
+                cache.CompiledSnapshots.save_description(path, name, description)
+
+    if description is None:
+        module = types.ModuleType(name)
+    else:
+        module = _Imitation(description).build()
+    modules[name] = module
+    return module
+
+
+def _start_worker():
+    """ Runs in a worker process when it starts. """
+    global _initial_modules
+    _initial_modules = frozenset(sys.modules)
+
+
+_pool = common.ProcessPool(lambda: settings.compiled_introspection_processes,
+                           _start_worker)
+# The modules of a worker before it imported anything for `describe_module`.
+_initial_modules = frozenset()
+
+
+def describe_module(name, fromlist, sys_path):
+    """ Runs in a worker process of `load_module`. """
+    sys.path = sys_path
+    try:
+        module = __import__(name, {}, {}, fromlist)
+    except AttributeError:
+        # see `compiled.load_module`
+        module = sys.modules[name]
+    return _Description(module, _initial_modules).entries
+
+
+def _safe_getattr(obj, name, default=None):
+    try:
+        return getattr(obj, name)
+    except Exception:
+        # Compiled objects may raise anything.
+        return default
+
+
+def _doc(obj):
+    doc = _safe_getattr(obj, '__doc__')
+    return doc if isinstance(doc, (str, unicode)) else None
+
+
+def _signature(obj):
+    """ Like ``CompiledObject._parse_function_doc``. """
+    from jedi.evaluate.compiled import _parse_function_doc
+    try:
+        doc = inspect.getdoc(obj)
+    except Exception:
+        doc = None
+    return _parse_function_doc(doc or '')
+
+
+class _Description(object):
+    """
+    Entries (tuples) that describe the objects of a module, they reference
+    other objects as ``('ref', index)``, ``('builtin', name)`` or
+    ``('value', value)``.
+    """
+    def __init__(self, module, known_modules):
+        self.module = module
+        self.known_modules = known_modules
+        self.entries = []
+        # id(obj) -> reference, the objects are kept alive in `_todo`/`_done`.
+        self._references = {}
+        self._todo = []
+        self._done = []
+
+        self.reference(module)
+        while self._todo:
+            obj = self._todo.pop()
+            index = self._references[id(obj)][1]
+            self.entries[index] = self._describe(obj)
+            self._done.append(obj)
+
+    def reference(self, obj):
+        try:
+            return self._references[id(obj)]
+        except KeyError:
+            pass
+        if type(obj) in _VALUES:
+            return 'value', obj
+        name = _safe_getattr(obj, '__name__')
+        if isinstance(name, str) and getattr(builtins, name, None) is obj:
+            return 'builtin', name
+
+        ref = self._references[id(obj)] = 'ref', len(self.entries)
+        self.entries.append(None)
+        self._todo.append(obj)
+        return ref
+
+    def _attributes(self, obj):
+        try:
+            names = list(vars(obj))
+        except TypeError:
+            return {}
+        return dict((n, self.reference(_safe_getattr(obj, n))) for n in names)
+
+    def _describe(self, obj):
+        name = _safe_getattr(obj, '__name__')
+        if inspect.ismodule(obj):
+            if obj is not self.module:
+                return 'module', name, None, None
+            attributes = self._attributes(obj)
+            for n in _IGNORED_MODULE_ATTRIBUTES:
+                attributes.pop(n, None)
+            return 'module', name, _doc(obj), attributes
+        elif inspect.isclass(obj):
+            module_name = _safe_getattr(obj, '__module__')
+            if module_name in self.known_modules:
+                qualname = _safe_getattr(obj, '__qualname__', name)
+                return 'known_class', name, module_name, qualname
+            bases = [self.reference(b) for b in obj.__bases__]
+            return ('class', name, module_name, _doc(obj), _signature(obj),
+                    bases, self._attributes(obj))
+        elif inspect.isroutine(obj):
+            objclass = _safe_getattr(obj, '__objclass__')
+            if objclass is not None:
+                objclass = self.reference(objclass)
+            return 'function', name, _doc(obj), _signature(obj), objclass
+        else:
+            return 'instance', self.reference(type(obj))
+
+
+class _ImitatedClass(type):
+    """
+    The type of imitated classes. Their dunder attributes are only used by
+    ``dir`` and ``getattr``, as class attributes they would change how the
+    class works.
+    """
+    def __dir__(cls):
+        names = set(type.__dir__(cls))
+        for c in cls.__mro__:
+            names.update(_dunders.get(c, ()))
+        return sorted(names)
+
+    def __getattr__(cls, name):
+        for c in cls.__mro__:
+            try:
+                return _dunders[c][name]
+            except KeyError:
+                pass
+        raise AttributeError(name)
+
+
+class _ImitatedFunction(object):
+    """ Looks like a method descriptor to ``inspect``. """
+    def __init__(self, name, doc, objclass):
+        self.__name__ = name
+        self.__doc__ = doc
+        if objclass is not None:
+            self.__objclass__ = objclass
+
+    def __get__(self, instance, owner=None):
+        return self
+
+    def __call__(self, *args, **kwargs):
+        raise TypeError("%s can't be called, it's an imitation." % self.__name__)
+
+    def __repr__(self):
+        return '<imitated function %s>' % self.__name__
+
+
+def is_builtin(obj):
+    """ Like ``inspect.isbuiltin`` for imitated functions of modules. """
+    return isinstance(obj, _ImitatedFunction) and not hasattr(obj, '__objclass__')
+
+
+class _Imitation(object):
+    """ Builds the objects of a `_Description`. """
+    def __init__(self, entries):
+        self.entries = entries
+        self.objects = [None] * len(entries)
+        self._built = [False] * len(entries)
+        self._attributes = []
+
+    def build(self):
+        module = self.get(('ref', 0))
+        # Attributes last, they may reference classes that reference them.
+        for obj, attributes in self._attributes:
+            for name, ref in attributes.items():
+                value = self.get(ref)
+                if inspect.ismodule(obj):
+                    obj.__dict__[name] = value
+                elif name.startswith('__') and name.endswith('__'):
+                    _dunders.setdefault(obj, {})[name] = value
+                else:
+                    try:
+                        setattr(obj, name, value)
+                    except (TypeError, AttributeError):
+                        pass
+        return module
+
+    def get(self, ref):
+        kind, value = ref
+        if kind == 'value':
+            return value
+        elif kind == 'builtin':
+            return getattr(builtins, value)
+        if not self._built[value]:
+            self._built[value] = True
+            self.objects[value] = self._create(self.entries[value])
+        return self.objects[value]
+
+    def _create(self, entry):
+        kind = entry[0]
+        if kind == 'module':
+            _, name, doc, attributes = entry
+            if attributes is None:
+                return sys.modules.get(name) or types.ModuleType(name)
+            module = types.ModuleType(name, doc)
+            self._attributes.append((module, attributes))
+            return module
+        elif kind == 'known_class':
+            _, name, module_name, qualname = entry
+            obj = modules.get(module_name) or sys.modules.get(module_name)
+            for part in qualname.split('.'):
+                obj = getattr(obj, part, None)
+            if inspect.isclass(obj):
+                return obj
+            return _ImitatedClass(name, (object,), {'__module__': module_name})
+        elif kind == 'class':
+            _, name, module_name, doc, signature, bases, attributes = entry
+            bases = tuple(b for b in map(self.get, bases) if inspect.isclass(b))
+            cls = self._create_class(name, bases, module_name, doc)
+            self._attributes.append((cls, attributes))
+            signatures[id(cls)] = cls, signature
+            return cls
+        elif kind == 'function':
+            _, name, doc, signature, objclass = entry
+            if objclass is not None:
+                objclass = self.get(objclass)
+            function = _ImitatedFunction(name, doc, objclass)
+            signatures[id(function)] = function, signature
+            return function
+        else:
+            cls = self.get(entry[1])
+            try:
+                return cls.__new__(cls)
+            except Exception:
+                return None
+
+    def _create_class(self, name, bases, module_name, doc):
+        namespace = {'__module__': module_name, '__doc__': doc}
+        try:
+            return _ImitatedClass(name, bases or (object,), namespace)
+        except TypeError:
+            # e.g. bases with an incompatible layout or metaclass.
+            return _ImitatedClass(name, (object,), namespace)
@@ -64,13 +64,11 @@ def search_params(evaluator, param):
         @memoize_default([], evaluator_is_first_arg=True)
         def get_posibilities(evaluator, module, func_name):
             try:
-                possible_stmts = module.used_names[func_name]
+                possible_stmts = module.called_names[func_name]
             except KeyError:
                 return []
 
             for stmt in possible_stmts:
-                if isinstance(stmt, pr.Import):
-                    continue
                 calls = helpers.scan_statement_for_calls(stmt, func_name)
                 for c in calls:
                     # no execution means that params cannot be set
@@ -142,13 +140,15 @@ def search_params(evaluator, param):
     func.listeners.add(listener)
 
     result = []
-    # This is like backtracking: Get the first possible result.
-    for mod in imports.get_modules_containing_name([current_module], func_name):
-        result = get_params_for_module(mod)
-        if result:
-            break
-
-    # cleanup: remove the listener; important: should not stick.
-    func.listeners.remove(listener)
+    try:
+        # This is like backtracking: Get the first possible result.
+        for mod in imports.get_modules_containing_name(evaluator, [current_module],
+                                                       func_name):
+            result = get_params_for_module(mod)
+            if result:
+                break
+    finally:
+        # cleanup: remove the listener; important: should not stick.
+        func.listeners.remove(listener)
 
     return result
@@ -19,12 +19,14 @@ from jedi.parser import representation as pr
 from jedi import debug
 from jedi import common
 from jedi import settings
+from jedi import cache
 from jedi.evaluate import representation as er
 from jedi.evaluate import dynamic
 from jedi.evaluate import compiled
 from jedi.evaluate import docstrings
 from jedi.evaluate import iterable
 from jedi.evaluate import imports
+from jedi.evaluate.cache import memoize_default, NO_DEFAULT
 
 
 class NameFinder(object):
@@ -35,6 +37,7 @@ class NameFinder(object):
         self.position = position
 
     def find(self, scopes, resolve_decorator=True):
+        self._evaluator.cancellation.check()
         names = self.filter_name(scopes)
         types = self._names_to_types(names, resolve_decorator)
         debug.dbg('finder._names_to_types: %s, old: %s', names, types)
@@ -52,7 +55,8 @@ class NameFinder(object):
                     # strange stuff...
                     names = self.scope.get_defined_names()
                 else:
-                    names = _get_defined_names_for_position(self.scope, self.position)
+                    names = _get_defined_names_for_position(self._evaluator, self.scope,
+                                                            self.position)
                 return iter([(self.scope, names)])
 
     def filter_name(self, scope_generator):
@@ -61,17 +65,19 @@ class NameFinder(object):
         `scope_generator`), until the name fits.
         """
         result = []
+        name_str = unicode(self.name_str)
         for nscope, name_list in scope_generator:
             break_scopes = []
+            if isinstance(name_list, (NameList, NamesBefore)):
+                name_list = name_list.lookup(name_str)
+            else:
+                name_list = [n for n in name_list if n.get_code() == name_str]
             if not isinstance(nscope, compiled.CompiledObject):
                 # Here is the position stuff happening (sorting of variables).
                 # Compiled objects don't need that, because there's only one
                 # reference.
                 name_list = sorted(name_list, key=lambda n: n.start_pos, reverse=True)
             for name in name_list:
-                if unicode(self.name_str) != name.get_code():
-                    continue
-
                 parpar = name.parent.parent
                 if name.parent.parent in break_scopes:
                     continue
@@ -353,7 +359,111 @@ def _check_isinstance_type(evaluator, stmt, search_name_part):
     return result
 
 
-def _get_defined_names_for_position(scope, position=None, start_scope=None):
+class NameList(list):
+    """
+    The names of a scope, that can also be looked up by their string. The
+    index is built with the first lookup.
+    """
+    def __init__(self, names):
+        super(NameList, self).__init__(names)
+        self._index = None
+
+    def lookup(self, name_str):
+        """ Returns the names with the string ``name_str`` in list order. """
+        if self._index is None:
+            self._index = {}
+            for n in self:
+                self._index.setdefault(n.get_code(), []).append(n)
+        return self._index.get(name_str, [])
+
+
+class NamesBefore(object):
+    """
+    The names of a `NameList` that are defined before ``position``. A lookup
+    only filters the names with the string, the list of all of them is only
+    built if it's iterated.
+    """
+    def __init__(self, names, position):
+        self._names = names
+        self._position = position
+        self._list = None
+
+    def lookup(self, name_str):
+        return [n for n in self._names.lookup(name_str)
+                if _is_before(n, self._position)]
+
+    def _get_list(self):
+        if self._list is None:
+            self._list = [n for n in self._names
+                          if _is_before(n, self._position)]
+        return self._list
+
+    def __iter__(self):
+        return iter(self._get_list())
+
+    def __len__(self):
+        return len(self._get_list())
+
+    def __getitem__(self, index):
+        return self._get_list()[index]
+
+    def __add__(self, other):
+        return self._get_list() + list(other)
+
+    def __radd__(self, other):
+        return list(other) + self._get_list()
+
+    def __eq__(self, other):
+        return self._get_list() == list(other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return repr(self._get_list())
+
+
+_parsed_names = {}
+"""
+Module path -> {scope: `NameList`} for the scopes of the parser and the
+builtins. Their names don't change until the module is parsed again.
+"""
+_BUILTINS = object()
+
+
+def _forget_parsed_names(path):
+    _parsed_names.pop(path, None)
+
+
+cache.parser_cache_listeners.append(_forget_parsed_names)
+
+
+def _defined_names(evaluator, scope):
+    """ ``scope.get_defined_names()``, the index is kept with it. """
+    if isinstance(scope, pr.Scope):
+        key = scope.get_parent_until().path
+    elif scope is compiled.builtin:
+        key = _BUILTINS
+    else:
+        return _evaluated_names(evaluator, scope)
+    names = _parsed_names.setdefault(key, {})
+    try:
+        return names[scope]
+    except KeyError:
+        names[scope] = name_list = NameList(scope.get_defined_names())
+        return name_list
+
+
+@memoize_default(NO_DEFAULT, evaluator_is_first_arg=True)
+def _evaluated_names(evaluator, scope):
+    return NameList(scope.get_defined_names())
+
+
+def _is_before(name, position):
+    return name.start_pos[0] is not None and name.start_pos < position
+
+
+def _get_defined_names_for_position(evaluator, scope, position=None, start_scope=None):
     """
     Return filtered version of ``scope.get_defined_names()``.
 
@@ -368,18 +478,14 @@ def _get_defined_names_for_position(scope, position=None, start_scope=None):
     :param    scope: Scope in which names are searched.
     :param position: The position as a line/column tuple, default is infinity.
     """
-    names = scope.get_defined_names()
+    names = _defined_names(evaluator, scope)
     # Instances have special rules, always return all the possible completions,
     # because class variables are always valid and the `self.` variables, too.
     if not position or isinstance(scope, (iterable.Array, er.Instance, compiled.CompiledObject)) \
             or start_scope != scope \
             and isinstance(start_scope, (pr.Function, er.FunctionExecution)):
         return names
-    names_new = []
-    for n in names:
-        if n.start_pos[0] is not None and n.start_pos < position:
-            names_new.append(n)
-    return names_new
+    return NamesBefore(names, position)
 
 
 def get_names_of_scope(evaluator, scope, position=None, star_search=True, include_builtin=True):
@@ -446,7 +552,8 @@ def get_names_of_scope(evaluator, scope, position=None, star_search=True, includ
                     for g in scope.scope_generator():
                         yield g
                 else:
-                    yield scope, _get_defined_names_for_position(scope, position, in_func_scope)
+                    yield scope, _get_defined_names_for_position(evaluator, scope, position,
+                                                                 in_func_scope)
             except StopIteration:
                 reraise(common.MultiLevelStopIteration, sys.exc_info()[2])
         if scope.isinstance(pr.ForFlow) and scope.is_list_comp:
@@ -467,7 +574,7 @@ def get_names_of_scope(evaluator, scope, position=None, star_search=True, includ
 
         # Add builtins to the global scope.
         if include_builtin:
-            yield compiled.builtin, compiled.builtin.get_defined_names()
+            yield compiled.builtin, _defined_names(evaluator, compiled.builtin)
 
 
 def _assign_tuples(tup, results, seek_name):
@@ -20,6 +20,7 @@ from jedi._compatibility import find_module, unicode
 from jedi import common
 from jedi import debug
 from jedi import cache
+from jedi.parser import Parser
 from jedi.parser import fast
 from jedi.parser import representation as pr
 from jedi.evaluate import sys_path
@@ -143,7 +144,7 @@ class ImportPath(pr.Base):
 
         if search_path is None:
             search_path = self._importer.sys_path_with_modifications()
-        for module_loader, name, is_pkg in pkgutil.iter_modules(search_path):
+        for name in get_module_names(search_path):
             names.append(self._generate_name(name))
         return names
 
@@ -354,18 +355,10 @@ class _Importer(object):
                 path = self.get_relative_path()
 
             if path is not None:
-                importing = find_module(string, [path])
+                return _find_module_cached(string, [path])
             else:
                 debug.dbg('search_module %s %s', string, self.file_path)
-                # Override the sys.path. It works only good that way.
-                # Injecting the path directly into `find_module` did not work.
-                sys.path, temp = sys_path, sys.path
-                try:
-                    importing = find_module(string)
-                finally:
-                    sys.path = temp
-
-            return importing
+                return _find_module_cached(string, sys_path, True)
 
         current_namespace = (None, None, None)
         # now execute those paths
@@ -416,6 +409,109 @@ class _Importer(object):
             return load_module(name=path), rest
 
 
+_find_module_cache = {}
+"""
+Maps ``(name, search path)`` to the result of `find_module` and the
+modification times of the directories that have been searched.
+"""
+
+_module_names_cache = {}
+"""
+Maps directories to their modification time and the module names in them.
+"""
+
+_max_find_module_cache_size = 10000
+
+
+def _mtimes(directories):
+    result = []
+    for d in directories:
+        try:
+            result.append(os.path.getmtime(d))
+        except OSError:
+            result.append(None)
+    return tuple(result)
+
+
+def _find_module_cached(string, search_path, use_sys_path=False):
+    """
+    Like `find_module`, but remembers where modules have been found.
+    A result is reused as long as no module could have been added to or
+    removed from the directories that were searched, which is checked with
+    their modification times. Raises ImportError like `find_module`.
+    """
+    key = string, tuple(search_path)
+    try:
+        searched, mtimes, result = _find_module_cache[key]
+    except KeyError:
+        pass
+    else:
+        if _mtimes(searched) == mtimes:
+            if result is None:
+                raise ImportError('Module %s not found' % string)
+            module_path, is_package, has_file = result
+            module_file = open(module_path, 'rb') if has_file else None
+            return module_file, module_path, is_package
+
+    if len(_find_module_cache) > _max_find_module_cache_size:
+        _find_module_cache.clear()
+
+    try:
+        if use_sys_path:
+            # Override the sys.path. It works only good that way.
+            # Injecting the path directly into `find_module` did not work.
+            sys.path, temp = list(search_path), sys.path
+            try:
+                module_file, module_path, is_package = find_module(string)
+            finally:
+                sys.path = temp
+        else:
+            module_file, module_path, is_package = find_module(string,
+                                                               search_path)
+    except ImportError:
+        _find_module_cache[key] = (key[1], _mtimes(search_path), None)
+        raise
+
+    # Modules in directories after the one of the module can't shadow it.
+    searched = key[1]
+    parent = os.path.dirname(module_path)
+    for i, d in enumerate(search_path):
+        if os.path.abspath(d) == parent:
+            searched = key[1][:i + 1]
+            break
+    result = module_path, is_package, module_file is not None
+    _find_module_cache[key] = (searched, _mtimes(searched), result)
+    return module_file, module_path, is_package
+
+
+def get_module_names(search_path):
+    """
+    Returns the names of the modules in the directories of ``search_path``,
+    like ``pkgutil.iter_modules``. The names are cached per directory as long
+    as its modification time doesn't change.
+    """
+    names = []
+    seen = set()
+    for directory in search_path:
+        try:
+            mtime = os.path.getmtime(directory)
+        except OSError:
+            continue
+        try:
+            cached_mtime, dir_names = _module_names_cache[directory]
+            if cached_mtime != mtime:
+                raise KeyError()
+        except KeyError:
+            dir_names = [name for loader, name, is_pkg
+                         in pkgutil.iter_modules([directory])]
+            _module_names_cache[directory] = mtime, dir_names
+        for name in dir_names:
+            if name not in seen:
+                seen.add(name)
+                names.append(name)
+    return names
+
+
 def strip_imports(evaluator, scopes):
     """
     Here we strip the imports - they don't get resolved necessarily.
@@ -447,7 +543,21 @@ def remove_star_imports(evaluator, scope, ignored_modules=()):
     modules += new
 
     # Filter duplicate modules.
-    return set(modules)
+    return frozenset(modules)
+
+
+_stdlib_path = os.path.dirname(os.path.abspath(os.__file__))
+
+
+def _is_library_path(path):
+    """
+    Libraries are in the standard library or in site-packages. They aren't
+    edited, so their function bodies are only parsed if they're needed.
+    """
+    path = os.path.abspath(path)
+    parts = path.split(os.path.sep)
+    return 'site-packages' in parts or 'dist-packages' in parts \
+        or path.startswith(_stdlib_path + os.path.sep)
 
 
 def load_module(path=None, source=None, name=None):
@@ -459,7 +569,11 @@ def load_module(path=None, source=None, name=None):
         else:
             return compiled.load_module(path, name)
         p = path or name
-        p = fast.FastParser(common.source_to_unicode(source), p)
+        source = common.source_to_unicode(source)
+        if settings.lazy_library_parsing and _is_library_path(path):
+            p = Parser(source, p, lazy_bodies=True)
+        else:
+            p = fast.FastParser(source, p)
         cache.save_parser(path, name, p)
         return p.module
 
@@ -467,24 +581,19 @@ def load_module(path=None, source=None, name=None):
     return load(source) if cached is None else cached.module
 
 
-def get_modules_containing_name(mods, name):
+def get_modules_containing_name(evaluator, mods, name):
     """
     Search a name in the directories of modules.
     """
-    def check_python_file(path):
-        try:
-            return cache.parser_cache[path].parser.module
-        except KeyError:
-            try:
-                return check_fs(path)
-            except IOError:
-                return None
-
     def check_fs(path):
-        with open(path, 'rb') as f:
-            source = source_to_unicode(f.read())
-            if name in source:
-                return load_module(path, source)
+        try:
+            with open(path, 'rb') as f:
+                source = source_to_unicode(f.read())
+        except IOError:
+            return None
+        if name in source:
+            return load_module(path, source)
+        unused.append((path, source))
 
     # skip non python modules
     mods = set(m for m in mods if not isinstance(m, compiled.CompiledObject))
@@ -503,8 +612,101 @@ def get_modules_containing_name(mods, name):
                         if entry.endswith('.py'):
                             paths.add(d + os.path.sep + entry)
 
-        for p in sorted(paths):
-            # make testing easier, sort it - same results on every interpreter
-            c = check_python_file(p)
-            if c is not None and c not in mods:
-                yield c
+        candidates = [p for p in paths if p not in cache.parser_cache]
+        if settings.use_filesystem_cache:
+            candidates = cache.NamesIndex.modules_using(name, candidates)
+        candidates = set(candidates)
+        futures = {}
+        if settings.parallel_module_parsing > 1 \
+                and settings.use_filesystem_cache and len(candidates) > 1:
+            # In the order they are used below, so the first ones are ready
+            # first.
+            futures = _parse_modules_in_parallel(sorted(candidates), name)
+
+        # Modules that don't use the name are saved in the index at once.
+        unused = []
+        try:
+            for p in sorted(paths):
+                # make testing easier, sort it - same results on every
+                # interpreter
+                evaluator.cancellation.check()
+                try:
+                    c = cache.parser_cache[p].parser.module
+                except KeyError:
+                    if p not in candidates or p in futures \
+                            and not _wait_for_worker(evaluator, futures[p]):
+                        continue
+                    c = check_fs(p)
+                if c is not None and c not in mods:
+                    yield c
+        finally:
+            # The caller may stop searching after any module.
+            for future in futures.values():
+                future.cancel()
+            if settings.use_filesystem_cache:
+                cache.NamesIndex.save_sources(unused)
+
+
+def _parse_modules_in_parallel(paths, name):
+    """
+    Starts parsing the modules that contain ``name`` in a pool of processes.
+    The parsers are passed back through the filesystem cache. Returns a dict
+    of paths and futures, see `_wait_for_worker`.
+    """
+    executor = _parser_pool.get()
+    if executor is None:
+        return {}
+    worker_settings = dict((s, getattr(settings, s)) for s in _WORKER_SETTINGS)
+    try:
+        return dict((p, executor.submit(_parse_module_if_contains,
+                                        (p, name, worker_settings)))
+                    for p in paths)
+    except Exception as e:
+        debug.warning('Parsing modules in workers failed: %r', e)
+        _parser_pool.kill()
+        return {}
+
+
+def _wait_for_worker(evaluator, future):
+    """
+    Waits for a module of `_parse_modules_in_parallel`, the search can be
+    cancelled meanwhile. Returns False if the module doesn't contain the
+    name.
+    """
+    from concurrent.futures import wait
+    while wait([future], timeout=0.05).not_done:
+        evaluator.cancellation.check()
+    try:
+        return future.result() is not None
+    except Exception as e:
+        # Check the module in this process.
+        debug.warning('Parsing a module in a worker failed: %r', e)
+        _parser_pool.kill()
+        return True
+
+
+_parser_pool = common.ProcessPool(lambda: settings.parallel_module_parsing)
+# The settings of the workers of `_parse_modules_in_parallel` are set to the
+# ones of the |jedi| process for every module, they decide how it's parsed.
+_WORKER_SETTINGS = ('cache_directory', 'use_filesystem_cache',
+                    'lazy_library_parsing', 'parser_cache_size')
+
+
+def _parse_module_if_contains(args):
+    """ Runs in a worker process of `_parse_modules_in_parallel`. """
+    path, name, worker_settings = args
+    for setting, value in worker_settings.items():
+        setattr(settings, setting, value)
+    try:
+        with open(path, 'rb') as f:
+            source = source_to_unicode(f.read())
+    except IOError:
+        return None
+    if name not in source:
+        cache.NamesIndex.save_sources([(path, source)])
+        return None
+    load_module(path, source)
+    # The worker is used again, the |jedi| process loads the module from the
+    # filesystem cache.
+    cache.clear_caches(delete_all=True)
+    return path
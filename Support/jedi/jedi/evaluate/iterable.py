@@ -20,6 +20,7 @@ It is important to note that:
 1. Array modfications work only in the current module.
 2. Jedi only checks Array additions; ``list.pop``, etc are ignored.
 """
+import bisect
 from itertools import chain
 
 from jedi import common
@@ -269,7 +270,7 @@ def _check_array_additions(evaluator, compare_array, module, is_list):
     if not settings.dynamic_array_additions or isinstance(module, compiled.CompiledObject):
         return []
 
-    def check_calls(calls, add_name):
+    def check_calls(calls, add_name, receiver, found_receivers, key):
         """
         Calls are processed here. The part before the call is searched and
         compared with the original Array.
@@ -284,12 +285,22 @@ def _check_array_additions(evaluator, compare_array, module, is_list):
                 # this means that there is no execution -> [].append
                 # or the keyword is at the start -> append()
                 continue
-            backtrack_path = iter(call_path[:separate_index])
-
-            position = c.start_pos
-            scope = c.get_parent_until(pr.IsScope)
+            backtrack_path = call_path[:separate_index]
+            if all(isinstance(n, pr.NamePart) for n in backtrack_path):
+                if tuple(call_path_simple[:separate_index]) != receiver:
+                    continue  # another receiver in the same statement
+            elif receiver:
+                continue
 
-            found = evaluator.eval_call_path(backtrack_path, scope, position)
+            if key in found_receivers:
+                found = found_receivers[key]
+            else:
+                position = c.start_pos
+                scope = c.get_parent_until(pr.IsScope)
+                found = evaluator.eval_call_path(iter(backtrack_path), scope,
+                                                 position)
+                if key is not None:
+                    found_receivers[key] = found
             if not compare_array in found:
                 continue
 
@@ -332,36 +343,60 @@ def _check_array_additions(evaluator, compare_array, module, is_list):
         ['add', 'update']
     comp_arr_parent = get_execution_parent(compare_array, er.FunctionExecution)
 
-    possible_stmts = []
-    res = []
-    for n in search_names:
+    definitions = {}
+
+    def definitions_before(name, position):
+        """ The number of statements that define `name` before `position`. """
         try:
-            possible_stmts += module.used_names[n]
+            positions = definitions[name]
         except KeyError:
-            continue
-        for stmt in possible_stmts:
-            # Check if the original scope is an execution. If it is, one
-            # can search for the same statement, that is in the module
-            # dict. Executions are somewhat special in jedi, since they
-            # literally copy the contents of a function.
-            if isinstance(comp_arr_parent, er.FunctionExecution):
-                stmt = comp_arr_parent. \
-                    get_statement_for_position(stmt.start_pos)
-                if stmt is None:
-                    continue
-            # InstanceElements are special, because they don't get copied,
-            # but have this wrapper around them.
-            if isinstance(comp_arr_parent, er.InstanceElement):
-                stmt = er.InstanceElement(comp_arr_parent.instance, stmt)
+            positions = definitions[name] = sorted(
+                s.start_pos for s in module.used_names.get(name, ())
+                if name in [unicode(d.names[0]) for d in s.get_defined_names()])
+        return bisect.bisect_left(positions, position)
 
-            if evaluator.recursion_detector.push_stmt(stmt):
-                # check recursion
-                continue
+    res = []
+    try:
+        for n in search_names:
+            for receiver, stmts in module.mutations.get(n, {}).items():
+                # Receivers with the same name path in the same flow, that
+                # see the same definitions of their first name, are the same
+                # objects. Evaluate them once and skip the statements, if
+                # they are not the array.
+                found_receivers = {}
+                for stmt in sorted(stmts, key=lambda s: s.start_pos):
+                    # Check if the original scope is an execution. If it is,
+                    # one can search for the same statement, that is in the
+                    # module dict. Executions are somewhat special in jedi,
+                    # since they literally copy the contents of a function.
+                    if isinstance(comp_arr_parent, er.FunctionExecution):
+                        stmt = comp_arr_parent. \
+                            get_statement_for_position(stmt.start_pos)
+                        if stmt is None:
+                            continue
+                    # InstanceElements are special, because they don't get
+                    # copied, but have this wrapper around them.
+                    if isinstance(comp_arr_parent, er.InstanceElement):
+                        stmt = er.InstanceElement(comp_arr_parent.instance, stmt)
+
+                    key = None
+                    if receiver:
+                        key = stmt.parent, \
+                            definitions_before(receiver[0], stmt.start_pos)
+                        found = found_receivers.get(key)
+                        if found is not None and compare_array not in found:
+                            continue
+
+                    if evaluator.recursion_detector.push_stmt(stmt):
+                        # check recursion
+                        continue
 
-            res += check_calls(helpers.scan_statement_for_calls(stmt, n), n)
-            evaluator.recursion_detector.pop_stmt()
-    # reset settings
-    settings.dynamic_params_for_other_modules = temp_param_add
+                    calls = helpers.scan_statement_for_calls(stmt, n)
+                    res += check_calls(calls, n, receiver, found_receivers, key)
+                    evaluator.recursion_detector.pop_stmt()
+    finally:
+        # reset settings
+        settings.dynamic_params_for_other_modules = temp_param_add
     return res
 
 
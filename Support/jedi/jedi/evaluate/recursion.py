@@ -18,7 +18,7 @@ def recursion_decorator(func):
     def run(evaluator, stmt, *args, **kwargs):
         rec_detect = evaluator.recursion_detector
         # print stmt, len(self.node_statements())
-        if rec_detect.push_stmt(stmt):
+        if evaluator.out_of_time() or rec_detect.push_stmt(stmt):
             return []
         else:
             result = func(evaluator, stmt, *args, **kwargs)
@@ -35,31 +35,36 @@ class RecursionDetector(object):
     def __init__(self):
         self.top = None
         self.current = None
+        # (module, position) -> number of those statements in the stack
+        self._counts = {}
+        # How often a recursion has been stopped.
+        self.trips = 0
 
     def push_stmt(self, stmt):
-        self.current = _RecursionNode(stmt, self.current)
-        check = self._check_recursion()
-        if check:  # TODO remove False!!!!
-            debug.warning('catched stmt recursion: %s against %s @%s', stmt,
-                          check.stmt, stmt.start_pos)
-            self.pop_stmt()
-            return True
+        self.current = node = _RecursionNode(stmt, self.current)
+        if node.key is not None:
+            count = self._counts.get(node.key, 0) + 1
+            self._counts[node.key] = count
+            if count > 1 and not node.in_list_comp:
+                debug.warning('catched stmt recursion: %s @%s', stmt,
+                              stmt.start_pos)
+                self.trips += 1
+                self.pop_stmt()
+                return True
         return False
 
     def pop_stmt(self):
-        if self.current is not None:
+        node = self.current
+        if node is not None:
             # I don't know how current can be None, but sometimes it happens
             # with Python3.
-            self.current = self.current.parent
-
-    def _check_recursion(self):
-        test = self.current
-        while True:
-            test = test.parent
-            if self.current == test:
-                return test
-            if not test:
-                return False
+            if node.key is not None:
+                count = self._counts[node.key] - 1
+                if count:
+                    self._counts[node.key] = count
+                else:
+                    del self._counts[node.key]
+            self.current = node.parent
 
     def node_statements(self):
         result = []
@@ -83,22 +88,19 @@ class _RecursionNode(object):
         # simple.
         self.is_ignored = isinstance(stmt, pr.Param) \
             or (self.script == compiled.builtin)
-
-    def __eq__(self, other):
-        if not other:
-            return None
-
-        is_list_comp = lambda x: isinstance(x, pr.ForFlow) and x.is_list_comp
-        return self.script == other.script \
-            and self.position == other.position \
-            and not is_list_comp(self.stmt.parent) \
-            and not is_list_comp(other.parent) \
-            and not self.is_ignored and not other.is_ignored
+        # Statements with the same key are recursions.
+        self.key = None if self.is_ignored else (self.script, self.position)
+        # List comprehensions may repeat a statement of the stack.
+        self.in_list_comp = isinstance(stmt.parent, pr.ForFlow) \
+            and stmt.parent.is_list_comp
 
 
 def execution_recursion_decorator(func):
     def run(execution, evaluate_generator=False):
-        detector = execution._evaluator.execution_recursion_detector
+        evaluator = execution._evaluator
+        if evaluator.out_of_time():
+            return []
+        detector = evaluator.execution_recursion_detector
         if detector.push_execution(execution, evaluate_generator):
             result = []
         else:
@@ -117,8 +119,12 @@ class ExecutionRecursionDetector(object):
     def __init__(self):
         self.recursion_level = 0
         self.parent_execution_funcs = []
+        # func -> how often it is in `parent_execution_funcs`
+        self._parent_counts = {}
         self.execution_funcs = set()
         self.execution_count = 0
+        # setting -> how often its limit has stopped an execution
+        self.trips = {}
 
     def __call__(self, execution, evaluate_generator=False):
         debug.dbg('Execution recursions: %s', execution, self.recursion_level,
@@ -131,19 +137,26 @@ class ExecutionRecursionDetector(object):
         return result
 
     def pop_execution(cls):
-        cls.parent_execution_funcs.pop()
+        base = cls.parent_execution_funcs.pop()
+        count = cls._parent_counts[base] - 1
+        if count:
+            cls._parent_counts[base] = count
+        else:
+            del cls._parent_counts[base]
         cls.recursion_level -= 1
 
     def push_execution(cls, execution, evaluate_generator):
-        in_par_execution_funcs = execution.base in cls.parent_execution_funcs
-        in_execution_funcs = execution.base in cls.execution_funcs
+        base = execution.base
+        in_par_execution_funcs = base in cls._parent_counts
+        in_execution_funcs = base in cls.execution_funcs
         cls.recursion_level += 1
         cls.execution_count += 1
-        cls.execution_funcs.add(execution.base)
-        cls.parent_execution_funcs.append(execution.base)
+        cls.execution_funcs.add(base)
+        cls.parent_execution_funcs.append(base)
+        cls._parent_counts[base] = cls._parent_counts.get(base, 0) + 1
 
         if cls.execution_count > settings.max_executions:
-            return True
+            return cls._trip('max_executions')
 
         if isinstance(execution.base, (iterable.Array, iterable.Generator)):
             return False
@@ -153,10 +166,15 @@ class ExecutionRecursionDetector(object):
 
         if in_par_execution_funcs:
             if cls.recursion_level > settings.max_function_recursion_level:
-                return True
+                return cls._trip('max_function_recursion_level')
         if in_execution_funcs and \
                 len(cls.execution_funcs) > settings.max_until_execution_unique:
-            return True
+            return cls._trip('max_until_execution_unique')
         if cls.execution_count > settings.max_executions_without_builtins:
-            return True
+            return cls._trip('max_executions_without_builtins')
         return False
+
+    def _trip(cls, setting):
+        debug.dbg('Execution stopped by settings.%s', setting)
+        cls.trips[setting] = cls.trips.get(setting, 0) + 1
+        return True
@@ -418,6 +418,7 @@ class FunctionExecution(Executable):
     @memoize_default(default=())
     @recursion.execution_recursion_decorator
     def get_return_types(self, evaluate_generator=False):
+        self._evaluator.cancellation.check()
         func = self.base
         # Feed the listeners, with the params.
         for listener in func.listeners:
@@ -425,7 +426,8 @@ class FunctionExecution(Executable):
         if func.is_generator and not evaluate_generator:
             return [iterable.Generator(self._evaluator, func, self.var_args)]
         else:
-            stmts = docstrings.find_return_types(self._evaluator, func)
+            # A copy, the result of `find_return_types` is cached.
+            stmts = list(docstrings.find_return_types(self._evaluator, func))
             for r in self.returns:
                 if r is not None:
                     stmts += self._evaluator.eval_statement(r)
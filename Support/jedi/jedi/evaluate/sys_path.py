@@ -18,12 +18,58 @@ def get_sys_path():
             venv, 'lib', 'python%d.%d' % sys.version_info[:2], 'site-packages')
         sys_path.insert(0, p)
 
-    check_virtual_env(sys.path)
-    return [p for p in sys.path if p != ""]
+    sys_path = list(sys.path)
+    check_virtual_env(sys_path)
+    return [p for p in sys_path if p != ""]
+
+
+_modifications_cache = {}
+"""
+Maps module paths to ``(key, sys_path)``, see `sys_path_with_modifications`.
+"""
 
 
-#@cache.memoize_default([]) TODO add some sort of cache again.
 def sys_path_with_modifications(module):
+    """
+    Returns `get_sys_path` plus the paths that the module adds to `sys.path`
+    and the Django paths above it.
+
+    The result is cached per module path and valid as long as the module's
+    modification time, the statements that use ``path``, `VIRTUAL_ENV` and
+    `sys.path` don't change. A hit only costs a ``stat`` of the module, the
+    directories above it are not searched for Django again. A new Django
+    project is found when the module is changed.
+    """
+    if module.path is None:
+        # Support for modules without a path is bad, therefore return the
+        # normal path.
+        return list(get_sys_path())
+
+    try:
+        mtime = os.path.getmtime(module.path)
+    except OSError:
+        mtime = None
+    if isinstance(module.used_names, pr.LazyUsedNames):
+        # Modules with lazy bodies are always read from their file, the
+        # modification time is enough. Don't parse the bodies for the key.
+        path_stmts = None
+    else:
+        path_stmts = tuple(sorted(s.get_code()
+                                  for s in module.used_names.get('path', ())
+                                  if isinstance(s, pr.Statement)))
+    key = mtime, os.getenv('VIRTUAL_ENV'), tuple(sys.path), path_stmts
+    try:
+        cached_key, result = _modifications_cache[module.path]
+        if cached_key == key:
+            return list(result)
+    except KeyError:
+        pass
+    result = _sys_path_with_modifications(module)
+    _modifications_cache[module.path] = key, result
+    return list(result)
+
+
+def _sys_path_with_modifications(module):
     def execute_code(code):
         c = "import os; from os.path import *; result=%s"
         variables = {'__file__': module.path}
@@ -85,11 +131,6 @@ def sys_path_with_modifications(module):
                     debug.dbg('sys path added: %s', res)
         return sys_path
 
-    if module.path is None:
-        # Support for modules without a path is bad, therefore return the
-        # normal path.
-        return list(get_sys_path())
-
     curdir = os.path.abspath(os.curdir)
     with common.ignored(OSError):
         os.chdir(os.path.dirname(module.path))
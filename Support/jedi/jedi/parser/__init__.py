@@ -40,10 +40,15 @@ class Parser(object):
     :type module_path: str
     :param no_docstr: If True, a string at the beginning is not a docstr.
     :param top_module: Use this module as a parent instead of `self.module`.
+    :param lazy_bodies: Don't parse the bodies of functions that are defined
+        in the module or in classes, until they are used (see
+        :class:`representation.LazyFunction`). Doesn't work with a tokenizer.
     """
     def __init__(self, source, module_path=None, no_docstr=False,
-                 tokenizer=None, top_module=None):
+                 tokenizer=None, top_module=None, lazy_bodies=False):
         self.no_docstr = no_docstr
+        self._lazy_lines = source.split('\n') if lazy_bodies else None
+        self._global_functions = []
 
         tokenizer = tokenizer or tokenize.source_tokens(source)
         self._gen = PushBackTokenizer(tokenizer)
@@ -52,6 +57,10 @@ class Parser(object):
         start_pos = next(self._gen).start_pos
         self._gen.push_last_back()
         self.module = pr.SubModule(module_path, start_pos, top_module)
+        if lazy_bodies:
+            self.module.used_names = pr.LazyUsedNames()
+            self.module.called_names = pr.LazyUsedNames(self.module.used_names.lazy)
+            self.module.mutations = pr.LazyUsedNames(self.module.used_names.lazy)
         self._scope = self.module
         self._top_module = top_module or self.module
 
@@ -75,6 +84,9 @@ class Parser(object):
             # because of `self.module.used_names`.
             d.parent = self.module
 
+        for func in self._global_functions:
+            func.parse_body()
+
         self.module.end_pos = self._gen.current.end_pos
         if self._gen.current.type in (tokenize.NEWLINE,):
             # This case is only relevant with the FastTokenizer, because
@@ -90,10 +102,8 @@ class Parser(object):
     def _check_user_stmt(self, simple):
         # this is not user checking, just update the used_names
         for tok_name in self.module.temp_used_names:
-            try:
-                self.module.used_names[tok_name].add(simple)
-            except KeyError:
-                self.module.used_names[tok_name] = set([simple])
+            # `setdefault` doesn't parse the functions of `pr.LazyUsedNames`.
+            self.module.used_names.setdefault(tok_name, set()).add(simple)
         self.module.temp_used_names = []
 
     def _parse_dot_name(self, pre_used_token=None):
@@ -311,6 +321,8 @@ class Parser(object):
 
         tok_list = []
         as_names = []
+        called_names = []
+        mutations = []
         in_lambda_param = False
         while not (tok.string in always_break
                    or tok.string in not_first_break and not tok_list
@@ -344,6 +356,16 @@ class Parser(object):
                     tok_list.pop()
                     if n:
                         tok_list.append(n)
+                        if tok.string == '(':
+                            called_names.append(unicode(n.names[-1]))
+                            if called_names[-1] in pr.MUTATING_METHODS:
+                                # `a.b.append(` -> ('a', 'b'), the receiver
+                                # of `x().append(` is not a name: ().
+                                if len(tok_list) > 1 and tok_list[-2] == '.':
+                                    receiver = ()
+                                else:
+                                    receiver = tuple(unicode(p) for p in n.names[:-1])
+                                mutations.append((called_names[-1], receiver))
                     continue
                 elif tok.string in opening_brackets:
                     level += 1
@@ -381,6 +403,11 @@ class Parser(object):
 
         stmt.parent = self._top_module
         self._check_user_stmt(stmt)
+        for name in called_names:
+            self.module.called_names.setdefault(name, set()).add(stmt)
+        for name, receiver in mutations:
+            receivers = self.module.mutations.setdefault(name, {})
+            receivers.setdefault(receiver, set()).add(stmt)
 
         if tok.string in always_break + not_first_break:
             self._gen.push_last_back()
@@ -434,6 +461,9 @@ class Parser(object):
                 self.freshscope = True
                 self._scope = self._scope.add_scope(func, self._decorators)
                 self._decorators = []
+                if self._lazy_lines is not None \
+                        and not isinstance(func.parent, pr.Function):
+                    self._skip_function_body(func)
             elif tok_str == 'class':
                 cls = self._parse_class()
                 if cls is None:
@@ -570,7 +600,8 @@ class Parser(object):
             elif tok_str in STATEMENT_KEYWORDS:
                 stmt, _ = self._parse_statement()
                 kw = pr.KeywordStatement(tok_str, tok.start_pos,
-                                         use_as_parent_scope, stmt)
+                                         use_as_parent_scope, stmt,
+                                         self.module)
                 self._scope.add_statement(kw)
                 if stmt is not None and tok_str == 'global':
                     for t in stmt._token_list:
@@ -602,6 +633,68 @@ class Parser(object):
                 continue
             self.no_docstr = False
 
+    def _skip_function_body(self, func):
+        """
+        Reads the tokens of the body of ``func`` without parsing them and makes
+        it a `pr.LazyFunction`, which parses the body if it's needed.
+        """
+        tok = next(self._gen)
+        if tok.type == tokenize.COMMENT:
+            tok = next(self._gen)
+        if tok.type != tokenize.NEWLINE:
+            # The body is on the same line, it's short anyway.
+            self._gen.push_last_back()
+            return
+
+        indent = func.start_pos[1]
+        level = 0
+        new_line = True
+        names = set()
+        has_global = False
+        end = None
+        try:
+            for tok in self._gen:
+                if tok.type == tokenize.NEWLINE:
+                    new_line = level <= 0
+                    continue
+                elif tok.type == tokenize.COMMENT:
+                    continue
+                elif new_line and tok.start_pos[1] <= indent:
+                    end = tok
+                    break
+                new_line = False
+                self.freshscope = False
+                if tok.type == tokenize.NAME:
+                    if tok.string == 'global':
+                        has_global = True
+                    elif not keyword.iskeyword(tok.string):
+                        names.add(tok.string)
+                elif tok.string in ('(', '[', '{'):
+                    level += 1
+                elif tok.string in (')', ']', '}'):
+                    level -= 1
+        finally:
+            lines = self._lazy_lines[func.start_pos[0] - 1:]
+            # Without e.g. `async` in front of `def`.
+            column = func.start_pos[1]
+            lines[0] = ' ' * column + lines[0][column:]
+            if end is None or end.type == tokenize.ENDMARKER:
+                source = '\n'.join(lines)
+            else:
+                source = '\n'.join(lines[:end.start_pos[0] - func.start_pos[0]])
+                source += '\n'
+            func.__class__ = pr.LazyFunction
+            func._lazy_body = source, end is not None
+            lazy = self.module.used_names.lazy
+            for name in names:
+                lazy.setdefault(name, []).append(func)
+            if has_global:
+                # Globals are defined in the module.
+                self._global_functions.append(func)
+
+        # The main loop closes the function, like without `lazy_bodies`.
+        self._gen.push_last_back()
+
 
 class PushBackTokenizer(object):
     def __init__(self, tokenizer):
@@ -3,6 +3,7 @@ Basically a parser that is faster, because it tries to parse only parts and if
 anything changes, it only reparses the changed parts. But because it's not
 finished (and still not working as I want), I won't document it any further.
 """
+import bisect
 import re
 
 from jedi._compatibility import use_metaclass, unicode
@@ -30,6 +31,10 @@ class Module(pr.Simple, pr.Module):
         parsers. """
         with common.ignored(AttributeError):
             del self._used_names
+        with common.ignored(AttributeError):
+            del self._called_names
+        with common.ignored(AttributeError):
+            del self._mutations
 
     def __getattr__(self, name):
         if name.startswith('__'):
@@ -49,6 +54,26 @@ class Module(pr.Simple, pr.Module):
                     used_names[k] = set(statement_set)
         return used_names
 
+    @property
+    @cache.underscore_memoization
+    def called_names(self):
+        called_names = {}
+        for p in self.parsers:
+            for k, statement_set in p.module.called_names.items():
+                called_names.setdefault(k, set()).update(statement_set)
+        return called_names
+
+    @property
+    @cache.underscore_memoization
+    def mutations(self):
+        mutations = {}
+        for p in self.parsers:
+            for k, receivers in p.module.mutations.items():
+                for receiver, statement_set in receivers.items():
+                    mutations.setdefault(k, {}).setdefault(receiver, set()) \
+                        .update(statement_set)
+        return mutations
+
     def __repr__(self):
         return "<fast.%s: %s@%s-%s>" % (type(self).__name__, self.name,
                                         self.start_pos[0], self.end_pos[0])
@@ -72,15 +97,15 @@ class CachedFastParser(type):
 class ParserNode(object):
     def __init__(self, parser, code, parent=None):
         self.parent = parent
-        self.code = code
-        self.hash = hash(code)
 
         self.children = []
         # must be created before new things are added to it.
-        self.save_contents(parser)
+        self.save_contents(parser, code)
 
-    def save_contents(self, parser):
+    def save_contents(self, parser, code):
         self.parser = parser
+        self.code = code
+        self.hash = hash(code)
 
         try:
             # with fast_parser we have either 1 subscope or only statements.
@@ -98,6 +123,12 @@ class ParserNode(object):
         self.children = []
 
     def reset_contents(self):
+        self.reset_own_contents()
+        for c in self.children:
+            c.reset_contents()
+
+    def reset_own_contents(self):
+        """ Like :meth:`reset_contents`, but leaves the children alone. """
         scope = self.content_scope
         for key, c in self._contents.items():
             setattr(scope, key, list(c))
@@ -108,9 +139,6 @@ class ParserNode(object):
             # they make no sense.
             self.parser.module.global_vars = []
 
-        for c in self.children:
-            c.reset_contents()
-
     def parent_until_indent(self, indent=None):
         if indent is None or self.indent >= indent and self.parent:
             self.old_children = []
@@ -209,12 +237,256 @@ class FastParser(use_metaclass(CachedFastParser)):
             self.parsers[:] = []
             raise
 
+    def update_edits(self, edits):
+        """
+        Like :meth:`update`, but takes a list of ``(start_line, end_line,
+        new_text)`` edits instead of the whole new source. The lines
+        ``start_line`` to ``end_line`` (starting with 1, both inclusive) are
+        replaced by the lines of ``new_text``; ``end_line = start_line - 1``
+        inserts. Every edit refers to the source after the previous edits.
+
+        Only the top level parts around an edit are split and parsed again.
+        The nodes and parsers of all the other parts stay where they are, the
+        ones after the edit are just moved by changing their ``line_offset``.
+        The whole source is not joined again, unless an edit changes how the
+        parts around it end (e.g. it opens a string), then everything is
+        parsed again like with :meth:`update`. If an edit is not valid,
+        ``ValueError`` is raised and nothing is changed.
+        """
+        length = len(self._lines)
+        for start_line, end_line, new_text in edits:
+            if not 1 <= start_line <= end_line + 1 <= length + 1:
+                raise ValueError('Edit (%s, %s) is not in a valid range.'
+                                 % (start_line, end_line))
+            length += len(new_text.splitlines()) - (end_line - start_line + 1)
+
+        self.module.reset_caches()
+        try:
+            for start_line, end_line, new_text in edits:
+                self._update_edit(start_line - 1, end_line,
+                                  new_text.splitlines())
+        except:
+            # FastParser is cached, be careful with exceptions
+            self.parsers[:] = []
+            raise
+
+    def _update_edit(self, start, end, new_lines):
+        """
+        Replaces the lines ``start:end`` with ``new_lines`` and parses the
+        parts between the closest safe boundaries around them again.
+        """
+        def first_at_line(items, line, key=lambda i: i.start_pos[0]):
+            """ The index of the first of the sorted ``items`` at ``line``. """
+            lo, hi = 0, len(items)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if items[mid] is not None and key(items[mid]) < line:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            return lo
+
+        def child_line(node):
+            return node.parser.module.start_pos[0]
+
+        def parser_index(node):
+            """ The index of the parser of ``node`` in the sorted parsers. """
+            i = first_at_line(self.parsers, child_line(node),
+                              lambda p: p.module.start_pos[0])
+            return self.parsers.index(node.parser, i)
+
+        parts, starts = self._parts, self._part_starts
+        root = self.current_node
+        if root is None or not parts:
+            self._lines[start:end] = new_lines
+            return self._reparse()
+        first, last, new_parts = self._split_edit(start, end, new_lines)
+        diff = len(new_lines) - (end - start)
+        region_start = starts[first]
+
+        # The nodes of the old parts in the region are children of the root
+        # node, like the ones after them. Parsers in front of the region may
+        # have used more lines than their part, then the region starts in
+        # them.
+        children = root.children
+        old_region_end = starts[last] if last < len(parts) else None
+        if old_region_end is None:
+            k = len(children)
+        else:
+            k = first_at_line(children, old_region_end + 1, child_line)
+            if k == len(children) \
+                    or child_line(children[k]) != old_region_end + 1:
+                return self._reparse()
+        if first == 0:
+            j = pi = 0
+            if not new_parts:
+                return self._reparse()
+        else:
+            j = first_at_line(children, region_start + 1, child_line)
+            if j == k or child_line(children[j]) != region_start + 1:
+                return self._reparse()
+            pi = parser_index(children[j])
+            if self.parsers[pi - 1].module.end_pos[0] > region_start:
+                return self._reparse()
+        if k < len(children):
+            pk = parser_index(children[k])
+        else:
+            pk = len(self.parsers)
+
+        parts[first:last] = new_parts
+        new_starts = _part_starts(new_parts, region_start)
+        if diff:
+            starts[first:] = new_starts + [s + diff for s in starts[last:]]
+        else:
+            starts[first:last] = new_starts
+        region_end = starts[first + len(new_parts)] \
+            if first + len(new_parts) < len(parts) else None
+
+        # Take the old region out of the root node.
+        scope = root.content_scope
+        tails = {}
+        for key in pr.SCOPE_CONTENTS:
+            items = getattr(scope, key)
+            if old_region_end is None:
+                tails[key] = []
+            else:
+                tails[key] = items[first_at_line(items, old_region_end + 1):]
+            del items[first_at_line(items, region_start + 1):]
+        global_vars = root.parser.module.global_vars
+        global_vars_after = [] if old_region_end is None else \
+            [g for g in global_vars if g.start_pos[0] > old_region_end]
+        region_children = children[j:k]
+        kept_children = children[k:]
+        kept_parsers = self.parsers[pk:]
+        del self.parsers[pi:]
+        for node in region_children:
+            node.reset_contents()
+        if old_region_end is None:
+            # The last part was parsed up to the end of the file, if it isn't
+            # the last one anymore, it has to be parsed again.
+            last_node = root
+            while last_node.children:
+                last_node = last_node.children[-1]
+            last_node.hash = None
+
+        if first == 0:
+            root.reset_own_contents()
+            # The parser of the root is reused if its part didn't change.
+            root.parser.module.global_vars = [
+                g for g in global_vars if g._sub_module is root.parser.module]
+            root.children = region_children
+            p = None
+        else:
+            root.parser.module.global_vars = \
+                [g for g in global_vars if g.start_pos[0] <= region_start]
+            root.children = children[:j]
+            p = self.parsers[-1]
+        root.old_children = region_children
+
+        # The parser of the last part needs to see the line after the region,
+        # that's where it stops.
+        if region_end is None:
+            tail = '\n' if self._ends_with_newline else ''
+        else:
+            tail = '\n' + self._lines[region_end]
+        code = '\n'.join(new_parts) + tail
+        # A part that is now the last one has to see the end of the file.
+        p = self._parse_parts(new_parts, code, region_start, p,
+                              reuse_last=region_end is not None)
+
+        root = self.current_node = self.current_node.parent_until_indent()
+        root.children += kept_children
+        for key in pr.SCOPE_CONTENTS:
+            getattr(root.content_scope, key).extend(tails[key])
+        root.parser.module.global_vars += global_vars_after
+        root.old_children = []
+        if first == 0 or any(map(_added_generator, region_children)):
+            root.content_scope.is_generator = root._is_generator or any(
+                map(_added_generator, root.children))
+        if diff:
+            for parser in kept_parsers:
+                parser.module.line_offset += diff
+        self.parsers += kept_parsers
+        self.module.end_pos = self.parsers[-1].module.end_pos
+
+        if region_end is not None and p.module.end_pos[0] > region_end:
+            # The region doesn't end where it used to, e.g. a string has been
+            # opened.
+            self._reparse()
+
+    def _reparse(self):
+        """ Parses the current lines again, without reusing any parsers. """
+        lines = self._lines
+        code = '\n'.join(lines)
+        if self._ends_with_newline:
+            code += '\n'
+        self.current_node = None
+        self.update(code)
+        # Without lines the code is still a newline.
+        self._lines = lines
+
+    def _split_edit(self, start, end, new_lines):
+        """
+        Replaces the lines ``start:end`` of the source with ``new_lines`` and
+        splits again the parts between the closest safe boundaries around the
+        edit. Returns the range of the parts that are replaced and the new
+        parts.
+        """
+        def is_boundary(index):
+            """
+            A line that starts a part no matter what is in front of it: A
+            ``def``, ``class`` or decorator without indentation, that doesn't
+            follow a decorator.
+            """
+            if not re.match(r_boundary, lines[index]):
+                return False
+            for i in range(index - 1, -1, -1):
+                m = re.match(r'^[\t ]*(.?)', lines[i])
+                if m.group(1) not in ['', '#']:
+                    return m.group(1) != '@'
+            return True
+
+        r_boundary = r'(def|class)\b|@'
+        lines, parts, starts = self._lines, self._parts, self._part_starts
+
+        # The first part to split again: It has to start before the edit,
+        # otherwise the edit could change the parts in front. Decorators don't
+        # work, because they may be appended to the part in front of them.
+        first = 0
+        for i in range(bisect.bisect_left(starts, start) - 1, 0, -1):
+            if re.match(r'(def|class)\b', parts[i]):
+                first = i
+                break
+
+        lines[start:end] = new_lines
+        diff = len(new_lines) - (end - start)
+
+        # The first part that can stay as it is. Empty lines at the end of a
+        # region are lost, they belong to the part after them.
+        region_start = starts[first]
+        for last in range(first + 1, len(parts) + 1):
+            if last == len(parts):
+                region_end = len(lines)
+            elif starts[last] >= end and is_boundary(starts[last] + diff):
+                region_end = starts[last] + diff
+            else:
+                continue
+            new_parts = self._split_lines(lines[region_start:region_end])
+            used = sum(part.count('\n') + 1 for part in new_parts)
+            if used == region_end - region_start or last == len(parts):
+                return first, last, new_parts
+
     def _split_parts(self, code):
         """
         Split the code into different parts. This makes it possible to parse
         each part seperately and therefore cache parts of the file and not
         everything.
         """
+        self._lines = code.splitlines()
+        self._ends_with_newline = code.endswith('\n')
+        return self._split_lines(self._lines)
+
+    def _split_lines(self, lines):
         def add_part():
             txt = '\n'.join(current_lines)
             if txt:
@@ -226,7 +498,6 @@ class FastParser(use_metaclass(CachedFastParser)):
 
         r_keyword = '^[ \t]*(def|class|@|%s)' % '|'.join(tokenize.FLOWS)
 
-        self._lines = code.splitlines()
         current_lines = []
         parts = []
         is_decorator = False
@@ -236,7 +507,7 @@ class FastParser(use_metaclass(CachedFastParser)):
         in_flow = False
         add_to_last = False
         # All things within flows are simply being ignored.
-        for i, l in enumerate(self._lines):
+        for i, l in enumerate(lines):
             # check for dedents
             m = re.match('^([\t ]*)(.?)', l)
             indent = len(m.group(1))
@@ -279,51 +550,76 @@ class FastParser(use_metaclass(CachedFastParser)):
 
     def _parse(self, code):
         """ :type code: str """
-        def empty_parser():
-            new, temp = self._get_parser(unicode(''), unicode(''), 0, [], False)
-            return new
-
         parts = self._split_parts(code)
+        self._parts = parts
+        self._part_starts = _part_starts(parts, 0)
         self.parsers[:] = []
 
-        line_offset = 0
+        self._parse_parts(parts, code, 0, None)
+
+        if self.parsers:
+            self.current_node = self.current_node.parent_until_indent()
+        else:
+            self.parsers.append(self._empty_parser())
+
+        self.module.end_pos = self.parsers[-1].module.end_pos
+
+        # print(self.parsers[0].module.get_code())
+        del code
+
+    def _empty_parser(self):
+        new, temp = self._get_parser(unicode(''), unicode(''), 0, 0,
+                                     None, [], False)
+        return new
+
+    def _parse_parts(self, parts, code, line_offset, p, reuse_last=True):
+        """
+        Parses ``parts``, that start at ``line_offset``, and adds them to the
+        current node. ``code`` starts with the parts, ``p`` is the parser in
+        front of them or None if they are the first ones. The last part is
+        always parsed again if ``reuse_last`` is False. Returns the last
+        parser.
+        """
         start = 0
-        p = None
-        is_first = True
+        is_first = p is None
 
-        for code_part in parts:
+        for i, code_part in enumerate(parts):
             lines = code_part.count('\n') + 1
             if is_first or line_offset >= p.module.end_pos[0]:
                 indent = len(re.match(r'[ \t]*', code_part).group(0))
-                if is_first and self.current_node is not None:
-                    nodes = [self.current_node]
-                else:
-                    nodes = []
+                first_node = self.current_node if is_first else None
+                nodes = []
                 if self.current_node is not None:
 
                     self.current_node = \
                         self.current_node.parent_until_indent(indent)
-                    nodes += self.current_node.old_children
+                    nodes = self.current_node.old_children
+                if not reuse_last and i == len(parts) - 1:
+                    first_node, nodes = None, []
 
                 # check if code_part has already been parsed
                 # print '#'*45,line_offset, p and p.module.end_pos, '\n', code_part
-                p, node = self._get_parser(code_part, code[start:],
-                                           line_offset, nodes, not is_first)
+                p, node = self._get_parser(code_part, code, start, line_offset,
+                                           first_node, nodes, not is_first)
 
                 # The actual used code_part is different from the given code
                 # part, because of docstrings for example there's a chance that
-                # splits are wrong.
-                used_lines = self._lines[line_offset:p.module.end_pos[0]]
-                code_part_actually_used = '\n'.join(used_lines)
+                # splits are wrong. Reuse the part if possible, its hash is
+                # cached and comparing it with itself is cheap.
+                if p.module.end_pos[0] == line_offset + lines:
+                    code_part_actually_used = code_part
+                else:
+                    used_lines = self._lines[line_offset:p.module.end_pos[0]]
+                    code_part_actually_used = '\n'.join(used_lines)
 
                 if is_first and p.module.subscopes:
                     # special case, we cannot use a function subscope as a
                     # base scope, subscopes would save all the other contents
-                    new = empty_parser()
+                    new = self._empty_parser()
                     if self.current_node is None:
                         self.current_node = ParserNode(new, '')
                     else:
-                        self.current_node.save_contents(new)
+                        self.current_node.save_contents(new, '')
                     self.parsers.append(new)
                     is_first = False
 
@@ -331,7 +627,8 @@ class FastParser(use_metaclass(CachedFastParser)):
                     if self.current_node is None:
                         self.current_node = ParserNode(p, code_part_actually_used)
                     else:
-                        self.current_node.save_contents(p)
+                        self.current_node.save_contents(
+                            p, code_part_actually_used)
                 else:
                     if node is None:
                         self.current_node = \
@@ -347,35 +644,37 @@ class FastParser(use_metaclass(CachedFastParser)):
 
             line_offset += lines
             start += len(code_part) + 1  # +1 for newline
+        return p
 
-        if self.parsers:
-            self.current_node = self.current_node.parent_until_indent()
-        else:
-            self.parsers.append(empty_parser())
-
-        self.module.end_pos = self.parsers[-1].module.end_pos
-
-        # print(self.parsers[0].module.get_code())
-        del code
-
-    def _get_parser(self, code, parser_code, line_offset, nodes, no_docstr):
+    def _get_parser(self, code, full_code, start, line_offset, first_node,
+                    nodes, no_docstr):
+        """
+        Reuses the parser of ``first_node`` or of one of ``nodes`` (the old
+        children of the current node), if ``code`` has been parsed before.
+        """
         h = hash(code)
-        hashes = [n.hash for n in nodes]
         node = None
         try:
-            index = hashes.index(h)
-            if nodes[index].code != code:
+            if first_node is not None and first_node.hash == h:
+                index = None
+                node = first_node
+            else:
+                # The matching node is normally one of the first ones, don't
+                # collect the hashes of all of them.
+                index = next(i for i, n in enumerate(nodes) if n.hash == h)
+                node = nodes[index]
+            if node.code != code:
                 raise ValueError()
-        except ValueError:
+        except (StopIteration, ValueError):
+            node = None
+            parser_code = full_code[start:]
             tokenizer = FastTokenizer(parser_code, line_offset)
             p = Parser(parser_code, self.module_path, tokenizer=tokenizer,
                        top_module=self.module, no_docstr=no_docstr)
             p.module.parent = self.module
         else:
-            if nodes[index] != self.current_node:
-                offset = int(nodes[0] == self.current_node)
-                self.current_node.old_children.pop(index - offset)
-            node = nodes.pop(index)
+            if index is not None:
+                nodes.pop(index)
             p = node.parser
             m = p.module
             m.line_offset += line_offset + 1 - m.start_pos[0]
@@ -388,6 +687,26 @@ class FastParser(use_metaclass(CachedFastParser)):
             self.current_node.reset_contents()
 
 
+def _part_starts(parts, line):
+    """ Returns the line numbers of the parts, the first starts at ``line``. """
+    starts = []
+    for part in parts:
+        starts.append(line)
+        line += part.count('\n') + 1
+    return starts
+
+
+def _added_generator(node):
+    """
+    The ``is_generator`` that :meth:`ParserNode._set_items` took from the
+    module of ``node`` when it was added, later nodes may have changed it.
+    """
+    module = node.parser.module
+    if node.content_scope is module:
+        return node._is_generator
+    return module.is_generator
+
+
 class FastTokenizer(object):
     """
     Breaks when certain conditions are met, i.e. a new function or class opens.
@@ -36,6 +36,7 @@ See also :attr:`Scope.subscopes` and :attr:`Scope.statements`.
 """
 import os
 import re
+import copy
 from inspect import cleandoc
 
 from jedi._compatibility import (next, Python3Method, encoding, unicode,
@@ -47,6 +48,8 @@ from jedi.parser import tokenize
 
 
 SCOPE_CONTENTS = 'asserts', 'subscopes', 'imports', 'statements', 'returns'
+# Methods that add to lists and sets, see `SubModule.mutations`.
+MUTATING_METHODS = 'append', 'extend', 'insert', 'add', 'update'
 
 
 class GetCodeState(object):
@@ -196,6 +199,45 @@ class IsScope(Base):
     __slots__ = ()
 
 
+def _items_at_position(items, pos):
+    """
+    Returns the items that contain ``pos`` in their order. ``items`` are the
+    contents of a scope, which the parser (and the fast parser) adds in the
+    order of their positions. Therefore a binary search is enough to find
+    them, even in huge modules. Flows also contain the flows after them (e.g.
+    ``else``), ``None`` (empty returns) is ignored.
+    """
+    def start(i):
+        # The ``None`` in front of an item have the position of the item.
+        while i < len(items) and items[i] is None:
+            i += 1
+        return items[i].start_pos if i < len(items) else None
+
+    lo, hi = 0, len(items)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        start_pos = start(mid)
+        if start_pos is None or start_pos > pos:
+            hi = mid
+        else:
+            lo = mid + 1
+
+    found = []
+    for i in range(lo - 1, -1, -1):
+        s = items[i]
+        if s is None:
+            continue
+        last = s
+        while isinstance(last, Flow) and last.next:
+            last = last.next
+        end_pos = last.end_pos
+        if None not in end_pos and end_pos < pos:
+            # The items don't overlap, the ones in front end even earlier.
+            break
+        found.append(s)
+    return reversed(found)
+
+
 class Scope(Simple, IsScope, DocstringMixin):
     """
     Super class for the parser tree, which represents the state of a python
@@ -311,33 +353,42 @@ class Scope(Simple, IsScope, DocstringMixin):
 
     @Python3Method
     def get_statement_for_position(self, pos, include_imports=False):
-        checks = self.statements + self.asserts
+        checks = [self.statements, self.asserts]
         if include_imports:
-            checks += self.imports
+            checks.append(self.imports)
         if self.isinstance(Function):
-            checks += self.params + self.decorators
-            checks += [r for r in self.returns if r is not None]
+            checks += [self.params, self.decorators, self.returns]
         if self.isinstance(Flow):
-            checks += self.inputs
+            checks.append(self.inputs)
         if self.isinstance(ForFlow) and self.set_stmt is not None:
-            checks.append(self.set_stmt)
-
-        for s in checks:
-            if isinstance(s, Flow):
-                p = s.get_statement_for_position(pos, include_imports)
-                while s.next and not p:
-                    s = s.next
-                    p = s.get_statement_for_position(pos, include_imports)
-                if p:
-                    return p
-            elif s.start_pos <= pos <= s.end_pos:
-                return s
-
-        for s in self.subscopes:
-            if s.start_pos <= pos <= s.end_pos:
-                p = s.get_statement_for_position(pos, include_imports)
-                if p:
-                    return p
+            checks.append([self.set_stmt])
+
+        for items in checks:
+            for s in _items_at_position(items, pos):
+                if isinstance(s, Flow):
+                    while s is not None and s.start_pos <= pos:
+                        p = s.get_statement_for_position(pos, include_imports)
+                        if p:
+                            return p
+                        s = s.next
+                else:
+                    return s
+
+        for s in _items_at_position(self.subscopes, pos):
+            p = s.get_statement_for_position(pos, include_imports)
+            if p:
+                return p
+
+    def get_scope_for_position(self, pos):
+        """
+        Returns the innermost scope or flow in this scope that contains
+        ``pos`` (without the flows after ``else`` and the like) or None.
+        """
+        for items in self.statements, self.subscopes:
+            for s in _items_at_position(items, pos):
+                if isinstance(s, Scope) \
+                        and (None in s.end_pos or s.end_pos >= pos):
+                    return s.get_scope_for_position(pos) or s
 
     def __repr__(self):
         try:
@@ -365,7 +416,7 @@ class SubModule(Scope, Module):
     of a module.
     """
     __slots__ = ('path', 'global_vars', 'used_names', 'temp_used_names',
-                 'line_offset', 'use_as_parent')
+                 'called_names', 'mutations', 'line_offset', 'use_as_parent')
 
     def __init__(self, path, start_pos=(1, 0), top_module=None):
         """
@@ -381,6 +432,13 @@ class SubModule(Scope, Module):
         self.global_vars = []
         self.used_names = {}
         self.temp_used_names = []
+        # The names that are called (``name(...)``) -> statements, a subset of
+        # `used_names`.
+        self.called_names = {}
+        # The calls of `MUTATING_METHODS`: method -> receiver -> statements.
+        # The receiver is the name path before the method, e.g. ('self', 'a')
+        # or () if it's not a name.
+        self.mutations = {}
         # this may be changed depending on fast_parser
         self.line_offset = 0
 
@@ -493,10 +551,12 @@ class Function(Scope):
     :param start_pos: The start position (line, column) the Function.
     :type start_pos: tuple(int, int)
     """
-    __slots__ = ('name', 'params', 'decorators', 'listeners', 'annotation')
+    __slots__ = ('name', 'params', 'decorators', 'listeners', 'annotation',
+                 '_lazy_body')
 
     def __init__(self, module, name, params, start_pos, annotation):
         super(Function, self).__init__(module, start_pos)
+        self._lazy_body = None
         self.name = name
         if name is not None:
             name.parent = self.use_as_parent
@@ -563,6 +623,149 @@ class Function(Scope):
         return '%s\n\n%s' % (self.get_call_signature(), docstr)
 
 
+def _lazy_scope_attribute(name):
+    member = getattr(Scope, name)
+
+    def get(self):
+        if self._lazy_body is not None:
+            self.parse_body()
+        return member.__get__(self, type(self))
+
+    def set(self, value):
+        member.__set__(self, value)
+    return property(get, set)
+
+
+class LazyFunction(Function):
+    """
+    A function whose body hasn't been parsed, yet. Only the source of the body
+    is saved (see the ``lazy_bodies`` option of the ``Parser``). It's parsed
+    as soon as the contents of the function are accessed and the function
+    becomes a normal :class:`Function` then.
+    """
+    __slots__ = ()
+
+    _lazy_attributes = SCOPE_CONTENTS + ('is_generator', '_doc_token')
+
+    asserts = _lazy_scope_attribute('asserts')
+    subscopes = _lazy_scope_attribute('subscopes')
+    imports = _lazy_scope_attribute('imports')
+    statements = _lazy_scope_attribute('statements')
+    returns = _lazy_scope_attribute('returns')
+    is_generator = _lazy_scope_attribute('is_generator')
+    _doc_token = _lazy_scope_attribute('_doc_token')
+
+    def parse_body(self):
+        if self._lazy_body is None:
+            return
+        source, dedented = self._lazy_body
+        self._lazy_body = None
+        self.__class__ = Function
+
+        from jedi.parser import Parser
+        module = self._sub_module
+        end_line, end_column = self._end_pos
+        if dedented and end_line is not None:
+            # The token that ended the function ends the scopes in it, too.
+            last_line = self._start_pos[0] + source.count('\n') - 1
+            source += '\n' * (end_line - last_line - 1) \
+                + ' ' * end_column + 'pass\n'
+        tokenizer = tokenize.source_tokens(source, self._start_pos[0] - 1)
+        body = Parser(source, module.path, tokenizer=tokenizer).module
+        body.line_offset = module.line_offset
+        try:
+            func = body.subscopes[0]
+        except IndexError:
+            return
+
+        # The names of the params are known already.
+        header = set([func.annotation])
+        for param in func.params:
+            header |= set([param, param.annotation_stmt])
+        for name, stmts in body.used_names.items():
+            stmts = stmts - header
+            if stmts:
+                module.used_names.setdefault(name, set()).update(stmts)
+        for name, stmts in body.called_names.items():
+            stmts = stmts - header
+            if stmts:
+                module.called_names.setdefault(name, set()).update(stmts)
+        for name, receivers in body.mutations.items():
+            for receiver, stmts in receivers.items():
+                stmts = stmts - header
+                if stmts:
+                    module.mutations.setdefault(name, {}) \
+                        .setdefault(receiver, set()).update(stmts)
+        module.global_vars += body.global_vars
+
+        # Statements with a lower indentation might have been added already.
+        for key in SCOPE_CONTENTS:
+            items = getattr(func, key)
+            for i in items:
+                if i is not None and i.parent is func:
+                    i.parent = self
+            setattr(self, key, items + getattr(self, key))
+        for scope in self.subscopes:
+            for d in scope.decorators:
+                if d.parent is func:
+                    d.parent = self
+        self.is_generator |= func.is_generator
+        if func._doc_token is not None:
+            self._doc_token = func._doc_token
+
+    def __copy__(self):
+        # Copies would parse the body again.
+        self.parse_body()
+        return copy.copy(self)
+
+    def __getstate__(self):
+        state = {}
+        for cls in type(self).__mro__:
+            for name in getattr(cls, '__slots__', ()):
+                if name in self._lazy_attributes:
+                    state[name] = getattr(Scope, name).__get__(self)
+                else:
+                    with common.ignored(AttributeError):
+                        state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            if name in self._lazy_attributes:
+                getattr(Scope, name).__set__(self, value)
+            else:
+                setattr(self, name, value)
+
+
+class LazyUsedNames(dict):
+    """
+    The ``used_names`` of a module with a :class:`LazyFunction`. ``lazy``
+    maps names to the functions that use them. These are parsed, before the
+    statements that use a name are returned. The ``called_names`` and
+    ``mutations`` of the module share ``lazy`` with its ``used_names``.
+    """
+    def __init__(self, lazy=None):
+        super(LazyUsedNames, self).__init__()
+        self.lazy = {} if lazy is None else lazy
+
+    def _parse_functions(self, name):
+        for func in self.lazy.pop(name, ()):
+            if isinstance(func, LazyFunction):
+                func.parse_body()
+
+    def __getitem__(self, name):
+        self._parse_functions(name)
+        return dict.__getitem__(self, name)
+
+    def get(self, name, default=None):
+        self._parse_functions(name)
+        return dict.get(self, name, default)
+
+    def __contains__(self, name):
+        self._parse_functions(name)
+        return dict.__contains__(self, name)
+
+
 class Lambda(Function):
     def __init__(self, module, params, start_pos, parent):
         super(Lambda, self).__init__(module, None, params, start_pos, None)
@@ -782,17 +985,26 @@ class KeywordStatement(Base):
     For the following statements: `assert`, `del`, `global`, `nonlocal`,
     `raise`, `return`, `yield`, `pass`, `continue`, `break`, `return`, `yield`.
     """
-    __slots__ = ('name', 'start_pos', '_stmt', 'parent')
+    __slots__ = ('name', '_sub_module', '_start_pos', '_stmt', 'parent')
 
-    def __init__(self, name, start_pos, parent, stmt=None):
+    def __init__(self, name, start_pos, parent, stmt=None, module=None):
         self.name = name
-        self.start_pos = start_pos
+        self._sub_module = module
+        self._start_pos = start_pos
         self._stmt = stmt
         self.parent = parent
 
         if stmt is not None:
             stmt.parent = self
 
+    @property
+    def start_pos(self):
+        if self._sub_module is None:
+            return self._start_pos
+        # Moves with the module like `Simple`, see the fast parser.
+        return self._sub_module.line_offset + self._start_pos[0], \
+            self._start_pos[1]
+
     def get_code(self):
         if self._stmt is None:
             return "%s\n" % self.name
@@ -849,7 +1061,12 @@ class Statement(Simple, DocstringMixin):
 
     @property
     def end_pos(self):
-        return self._token_list[-1].end_pos
+        last = self._token_list[-1]
+        if isinstance(last, (tokenize.Token, Operator)):
+            # These don't know their module, they don't move with it.
+            end_line, end_column = last.end_pos
+            return self._sub_module.line_offset + end_line, end_column
+        return last.end_pos
 
     def get_code(self, new_line=True):
         def assemble(command_list, assignment=None):
@@ -5,7 +5,6 @@ from jedi import cache
 from jedi.parser import tokenize
 from jedi._compatibility import u
 from jedi.parser.fast import FastParser
-from jedi.parser import representation
 from jedi import debug
 from jedi.common import PushBackIterator
 
@@ -242,13 +241,8 @@ class UserContextParser(object):
     def user_scope(self):
         user_stmt = self.user_stmt()
         if user_stmt is None:
-            def scan(scope):
-                for s in scope.statements + scope.subscopes:
-                    if isinstance(s, representation.Scope):
-                        if s.start_pos <= self._position <= s.end_pos:
-                            return scan(s) or s
-
-            return scan(self.module()) or self.module()
+            module = self.module()
+            return module.get_scope_for_position(self._position) or module
         else:
             return user_stmt.parent
 
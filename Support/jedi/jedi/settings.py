@@ -26,12 +26,18 @@ Filesystem cache
 
 .. autodata:: cache_directory
 .. autodata:: use_filesystem_cache
+.. autodata:: filesystem_cache_max_age
+.. autodata:: filesystem_cache_max_size
+.. autodata:: parser_cache_size
 
 
 Parser
 ~~~~~~
 
 .. autodata:: fast_parser
+.. autodata:: lazy_library_parsing
+.. autodata:: compiled_introspection_processes
+.. autodata:: compiled_introspection_timeout
 
 
 Dynamic stuff
@@ -42,6 +48,7 @@ Dynamic stuff
 .. autodata:: dynamic_params
 .. autodata:: dynamic_params_for_other_modules
 .. autodata:: additional_dynamic_modules
+.. autodata:: parallel_module_parsing
 
 
 .. _settings-recursion:
@@ -69,8 +76,9 @@ definitely worse in some cases. But a completion should also be fast.
 Caching
 ~~~~~~~
 
-.. autodata:: star_import_cache_validity
 .. autodata:: call_signatures_validity
+.. autodata:: persistent_evaluator_cache
+.. autodata:: memoize_statistics
 
 
 """
@@ -132,6 +140,29 @@ On Linux, if environment variable ``$XDG_CACHE_HOME`` is set,
 ``$XDG_CACHE_HOME/jedi`` is used instead of the default one.
 """
 
+filesystem_cache_max_age = 30 * 24 * 60 * 60.0
+"""
+Modules that haven't been saved to the filesystem cache for this many seconds
+are removed from it. Modules whose files were deleted or changed are always
+removed. This only happens in :func:`jedi.cache.remove_old_modules`, which
+long running processes should call when they are idle.
+"""
+
+filesystem_cache_max_size = 500 * 2 ** 20
+"""
+The maximum size of the filesystem cache in bytes. If it's bigger, the modules
+saved the longest time ago are removed.
+"""
+
+parser_cache_size = 300000
+"""
+The maximum number of parsed lines that are kept in memory. A parsed line
+needs about 1.5 KB. If there are more, the least recently used modules are
+removed and loaded from the filesystem cache again when needed. The module
+you're working on and the modules in the same directory are always kept.
+``None`` means no limit.
+"""
+
 # ----------------
 # parser
 # ----------------
@@ -143,6 +174,29 @@ something has been changed e.g. to a function. If this happens, only the
 function is being reparsed.
 """
 
+lazy_library_parsing = True
+"""
+Parse the bodies of functions in the standard library and in site-packages
+only when they are needed, e.g. for return values. This makes importing big
+libraries faster and uses less memory. These modules don't use the fast
+parser, since they aren't edited.
+"""
+
+compiled_introspection_processes = 0
+"""
+Number of worker processes that import compiled modules (C extensions) and
+describe them to |jedi|, instead of importing them into the |jedi| process.
+This keeps the process small and survives extensions that crash while being
+imported. ``0`` imports them in the current process.
+"""
+
+compiled_introspection_timeout = 3.0
+"""
+Seconds to wait for a worker of :data:`compiled_introspection_processes`. A
+worker that takes longer (e.g. because the extension hangs) is killed and the
+module stays empty.
+"""
+
 # ----------------
 # dynamic stuff
 # ----------------
@@ -174,6 +228,14 @@ Additional modules in which |jedi| checks if statements are to be found. This
 is practical for IDEs, that want to administrate their modules themselves.
 """
 
+parallel_module_parsing = 0
+"""
+Number of processes that parse other modules at the same time when they are
+searched for usages and dynamic params. The parsers are passed back through
+the filesystem cache, so this only works with :data:`use_filesystem_cache`.
+``0`` parses them one after another in the current process.
+"""
+
 dynamic_flow_information = True
 """
 Check for `isinstance` and other information to infer a type.
@@ -221,15 +283,25 @@ scale `max_executions` and `max_until_execution_unique`:
 # caching validity (time)
 # ----------------
 
-star_import_cache_validity = 60.0
-"""
-In huge packages like numpy, checking all star imports on every completion
-might be slow, therefore we do a star import caching, that lasts a certain
-time span (in seconds).
-"""
-
 call_signatures_validity = 3.0
 """
 Finding function calls might be slow (0.1-0.5s). This is not acceptible for
 normal writing. Therefore cache it for a short time.
 """
+
+persistent_evaluator_cache = False
+"""
+Keep the results of the evaluation (e.g. return types of functions) for the
+next :class:`jedi.Script`, instead of calculating everything again. A result
+is deleted as soon as one of the modules it depends on is parsed again. This
+is useful for long running processes, like editor plugins that keep |jedi|
+running.
+"""
+
+memoize_statistics = False
+"""
+Count how often the results of the memoized evaluation functions are
+calculated and used again. The numbers are in
+``Evaluator.memoize_cache.statistics``, they help to find out which caches
+are worth it.
+"""
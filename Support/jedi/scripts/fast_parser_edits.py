@@ -0,0 +1,81 @@
+#! /usr/bin/env python
+"""
+Compares the cost of one edit with ``FastParser.update_edits`` against a
+``FastParser.update`` with the whole new source, for growing module sizes.
+
+With ``update_edits`` only the parts around the edit are split and parsed
+again. The parsers after the edit are moved by changing their ``line_offset``,
+that's the only thing that grows with the module and it's cheap. The script
+fails if the time per edit doesn't grow at least five times slower than the
+module.
+
+Usage:
+  fast_parser_edits.py [-n <number>] [<size>...]
+  fast_parser_edits.py -h | --help
+
+Options:
+  -h --help     Show this screen.
+  -n <number>   Number of edits per module size [default: 20].
+"""
+import time
+
+from docopt import docopt
+from jedi.parser.fast import FastParser
+
+
+def generate_module(classes):
+    """Return the source of a module with ``classes`` classes and functions."""
+    lines = ['import os', '']
+    for i in range(classes):
+        lines += ['class C%d(object):' % i,
+                  '    def method(self, a):',
+                  '        x = a + %d' % i,
+                  '        return x',
+                  '',
+                  '@decorator',
+                  'def f%d(b):' % i,
+                  '    if b:',
+                  '        return b',
+                  '    return [%d]' % i,
+                  '']
+    return '\n'.join(lines) + '\n'
+
+
+def run(classes, number):
+    source = generate_module(classes)
+    lines = source.splitlines()
+    line = len(lines) // 2 + 3  # a line within a function body
+    parser = FastParser(source)
+
+    start = time.time()
+    for i in range(number):
+        parser.update_edits([(line, line, '        x = a + %d' % i)])
+        parser.update_edits([(line, line - 1, '        y = a')])
+        parser.update_edits([(line, line, '')])
+    edits = (time.time() - start) / number / 3
+
+    start = time.time()
+    for i in range(number):
+        lines[line - 1] = '        x = a + %d' % i
+        parser.update('\n'.join(lines) + '\n')
+    updates = (time.time() - start) / number
+    return len(lines), edits, updates
+
+
+def main(args):
+    n = int(args['-n'])
+    sizes = [int(s) for s in args['<size>']] or [100, 300, 1000, 3000]
+    print('   Lines | update_edits (s) | update (s)')
+    print('-----------------------------------------')
+    results = []
+    for size in sorted(sizes):
+        results.append(run(size, n))
+        print('%8d | %16.4f | %10.4f' % results[-1])
+    (small, small_edits, _), (big, big_edits, _) = results[0], results[-1]
+    if big > small:
+        assert big_edits / small_edits < big / (5.0 * small), \
+            'The time of update_edits grows with the module size.'
+
+
+if __name__ == '__main__':
+    main(docopt(__doc__))
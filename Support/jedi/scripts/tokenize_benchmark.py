@@ -0,0 +1,82 @@
+#! /usr/bin/env python
+"""
+Measures the throughput of the tokenizer over all the modules of the standard
+library (or the given directories). Compares ``generate_tokens`` with only
+matching ``pseudoprog`` over the source, which is the part that any tokenizer
+based on these regular expressions has to do.
+
+Usage:
+  tokenize_benchmark.py [-n <number>] [<directory>...]
+  tokenize_benchmark.py -h | --help
+
+Options:
+  -h --help     Show this screen.
+  -n <number>   Number of runs, the fastest one is shown [default: 3].
+"""
+import os
+import time
+from io import StringIO
+
+from docopt import docopt
+from jedi.common import source_to_unicode
+from jedi.parser import tokenize
+
+
+def read_sources(directories):
+    sources = []
+    for directory in directories:
+        for root, dirs, files in os.walk(directory):
+            for f in files:
+                if f.endswith('.py'):
+                    with open(os.path.join(root, f), 'rb') as f:
+                        try:
+                            sources.append(source_to_unicode(f.read()))
+                        except UnicodeDecodeError:
+                            pass
+    return sources
+
+
+def generate_tokens(source):
+    for token in tokenize.generate_tokens(StringIO(source + '\n').readline):
+        pass
+
+
+def pseudoprog_matches(source):
+    """Matches the whole source in one pass, without creating tokens."""
+    match = tokenize.pseudoprog.match
+    pos, end = 0, len(source)
+    while pos < end:
+        m = match(source, pos)
+        pos = m.end() if m is not None and m.end() > pos else pos + 1
+
+
+def count_tokens(source):
+    return sum(1 for t in tokenize.source_tokens(source))
+
+
+def run(function, sources, number):
+    times = []
+    for i in range(number):
+        start = time.time()
+        for source in sources:
+            function(source)
+        times.append(time.time() - start)
+    return min(times)
+
+
+def main(args):
+    directories = args['<directory>'] or [os.path.dirname(os.__file__)]
+    sources = read_sources(directories)
+    size = sum(len(s) for s in sources) / 2.0 ** 20
+    tokens = sum(count_tokens(s) for s in sources)
+    print('%d modules, %.1f MB, %d tokens' % (len(sources), size, tokens))
+    print('                    |   Time (s) |   MB/s | Tokens/s')
+    print('----------------------------------------------------')
+    for name, function in [('generate_tokens', generate_tokens),
+                           ('pseudoprog only', pseudoprog_matches)]:
+        t = run(function, sources, int(args['-n']))
+        print('%-19s | %10.2f | %6.2f | %8d' % (name, t, size / t, tokens / t))
+
+
+if __name__ == '__main__':
+    main(docopt(__doc__))
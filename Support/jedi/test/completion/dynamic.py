@@ -130,6 +130,14 @@ arr.append(1)
 #? int()
 arr[0]
 
+arr2 = [1]
+other = ['']
+[arr2.append(1.0), other.append({})]
+#? int() float()
+arr2[10]
+#? str() dict()
+other[10]
+
 # -----------------
 # list.insert
 # -----------------
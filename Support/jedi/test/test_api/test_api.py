@@ -5,6 +5,7 @@ Test all things related to the ``jedi.api`` module.
 from textwrap import dedent
 
 from jedi import api
+from jedi import settings
 from pytest import raises
 
 
@@ -132,3 +133,41 @@ def test_goto_definition_not_multiple():
 def test_usage_description():
     for u in api.Script('foo = ''; foo').usages():
         assert u.description == 'foo'
+
+
+def test_completion_timeout():
+    """
+    After the timeout nothing is evaluated anymore and the incomplete results
+    are not used again.
+    """
+    script = api.Script(dedent('''
+        def f():
+            return ''
+        f().'''))
+    assert script.completions(timeout=0) == []
+    assert 'upper' in [c.name for c in script.completions(timeout=10)]
+    assert script._evaluator.deadline is None
+
+
+def test_cancellation():
+    class Token(api.CancellationToken):
+        """ Is cancelled after some checks. """
+        checks = 0
+
+        def check(self):
+            self.checks += 1
+            self.cancelled = self.checks > 5
+            super(Token, self).check()
+
+    s = dedent('''
+        def f(a):
+            return a
+        f(1)
+        x = [f('')]
+        x.append(3)
+        x[0].''')
+    settings_before = settings.dynamic_params_for_other_modules
+    with raises(api.Cancelled):
+        api.Script(s, cancellation=Token()).completions()
+    assert settings.dynamic_params_for_other_modules == settings_before
+    assert 'upper' in [c.name for c in api.Script(s).completions()]
@@ -2,13 +2,19 @@
 Test all things related to the ``jedi.cache`` module.
 """
 
+import inspect
+import math
 import time
 
 import pytest
 
 import jedi
 from jedi import settings, cache
+from jedi._compatibility import u
+from jedi.parser import Parser
 from jedi.cache import ParserCacheItem, ParserPickling
+from jedi.evaluate import compiled
+from jedi.evaluate.compiled import introspection
 
 
 ParserPicklingCls = type(ParserPickling)
@@ -62,22 +68,204 @@ def test_modulepickling_delete_incompatible_cache():
     assert cached2 is None
 
 
-def test_star_import_cache_duration():
-    new = 0.01
-    old, jedi.settings.star_import_cache_validity = \
-        jedi.settings.star_import_cache_validity, new
+@pytest.mark.usefixtures("isolated_jedi_cache")
+def test_modulepickling_shared_file():
+    """
+    All parsers are appended to one file, other instances (processes) see
+    them and superseded records are removed by compacting the file.
+    """
+    cache1 = ParserPicklingCls()
+    cache1._min_compact_size = 100
+    cache2 = ParserPicklingCls()
+    for i in range(20):
+        cache1.save_parser('path %s' % (i % 2), ParserCacheItem('parser %s' % i))
+
+    assert cache2.load_parser('path 0', None) == 'parser 18'
+    assert cache2.load_parser('path 1', None) == 'parser 19'
+    cache2.save_parser('path 2', ParserCacheItem('parser 20'))
+    assert cache1.load_parser('path 2', None) == 'parser 20'
+    assert len(cache1._mmap) < 20 * cache1._record.size
+
+
+@pytest.mark.usefixtures("isolated_jedi_cache")
+def test_modulepickling_interrupted_write():
+    cache1 = ParserPicklingCls()
+    cache1.save_parser('path', ParserCacheItem('parser'))
+    with open(cache1._get_path('parsers.cache'), 'ab') as f:
+        f.write(b'garbage of a crashed process')
+
+    cache2 = ParserPicklingCls()
+    assert cache2.load_parser('path', None) == 'parser'
+    cache2.save_parser('other path', ParserCacheItem('other parser'))
+    assert cache1.load_parser('other path', None) == 'other parser'
+
+
+@pytest.mark.usefixtures("isolated_jedi_cache")
+@pytest.mark.skipif('cache.fcntl is None')
+def test_modulepickling_save_while_compacting(monkeypatch):
+    """
+    A process that waits for the lock while another one compacts the file
+    writes to the new file.
+    """
+    cache1 = ParserPicklingCls()
+    cache2 = ParserPicklingCls()
+    cache1.save_parser('path', ParserCacheItem('parser'))
+
+    flock = cache.fcntl.flock
+    compacted = []
+
+    def compact_first(fd, operation):
+        if operation == cache.fcntl.LOCK_EX and not compacted:
+            compacted.append(True)
+            cache2._compact()
+        flock(fd, operation)
+
+    monkeypatch.setattr(cache.fcntl, 'flock', compact_first)
+    cache1.save_parser('other path', ParserCacheItem('other parser'))
+    assert compacted
+    assert ParserPicklingCls().load_parser('other path', None) \
+        == 'other parser'
+
+
+def test_modulepickling_remove_old_modules(monkeypatch, tmpdir):
+    monkeypatch.setattr(settings, 'cache_directory', str(tmpdir.mkdir('c')))
+    deleted = tmpdir.join('deleted.py')
+    deleted.write('a = 1')
+    changed = tmpdir.join('changed.py')
+    changed.write('a = 1')
+    kept = tmpdir.join('kept.py')
+    kept.write('a = 1')
+
+    cache = ParserPicklingCls()
+    for path in (deleted, changed, kept):
+        cache.save_parser(str(path), ParserCacheItem('parser', path.mtime()))
+    cache.save_parser('old', ParserCacheItem('parser'))
+    legacy = tmpdir.join('c', cache.py_tag, 'index.json')
+    legacy.write('{}')
+
+    deleted.remove()
+    changed.write('a = 2')
+    changed.setmtime(changed.mtime() + 10)
+    cache._remove_old_modules()
+    assert sorted(cache._index) == sorted(['old', str(kept)])
+    assert not legacy.check()
+
+    monkeypatch.setattr(time, 'time', lambda: 10 ** 10)
+    cache._remove_old_modules()
+    assert list(cache._index) == []
+
+    monkeypatch.undo()
+    monkeypatch.setattr(settings, 'cache_directory', str(tmpdir.join('c')))
+    cache.save_parser('old', ParserCacheItem('parser'))
+    cache.save_parser(str(kept), ParserCacheItem('parser', kept.mtime()))
+    # Only the module saved last fits.
+    record = cache._index[str(kept)]
+    size = cache._header.size + record.end - record.start
+    monkeypatch.setattr(settings, 'filesystem_cache_max_size', size)
+    cache._remove_old_modules()
+    assert list(cache._index) == [str(kept)]
+
+
+@pytest.mark.usefixtures("isolated_jedi_cache")
+def test_remove_old_modules_when_idle(monkeypatch):
+    """ Saving modules doesn't remove old ones, that's done when idle. """
+    removed = []
+    for record_file in (cache.ParserPickling, cache.NamesIndex,
+                        cache.CompiledSnapshots):
+        monkeypatch.setattr(record_file, '_remove_old_modules',
+                            lambda f=record_file: removed.append(f))
+    for i in range(500):
+        cache.ParserPickling.save_parser('module%s' % i,
+                                         ParserCacheItem('parser'))
+    assert removed == []
+
+    cache.remove_old_modules()
+    assert len(removed) == 3
+
+
+@pytest.mark.usefixtures("isolated_jedi_cache")
+def test_names_index(tmpdir):
+    """
+    Modules that don't use a name aren't read when searching for it.
+    """
+    index = type(cache.NamesIndex)()
+    with_name = tmpdir.join('a.py')
+    with_name.write('import os\nos.path\n')
+    without = tmpdir.join('b.py')
+    without.write('x = 3\n')
+    paths = [str(with_name), str(without)]
+
+    assert index.modules_using('os', paths) == paths
+    index.save_module(str(with_name), Parser(u(with_name.read())).module)
+    index.save_sources([(str(without), u(without.read()))])
+    assert index.modules_using('os', paths) == [str(with_name)]
+    assert index.modules_using('x', paths) == [str(without)]
+    assert type(cache.NamesIndex)().modules_using('os', paths) \
+        == [str(with_name)]
+
+    # Changed modules are searched again.
+    without.write('import os\n')
+    assert index.modules_using('os', paths) == paths
+    index.save_sources([(str(without), u(without.read()))])
+    assert index.modules_using('x', paths) == []
+
+
+@pytest.mark.usefixtures("isolated_jedi_cache")
+def test_parser_cache_size(monkeypatch):
+    """
+    The least recently used modules are removed from the parser cache and
+    loaded from the filesystem cache again.
+    """
+    parser = Parser(u('a = 1\n') * 10)
+    assert parser.module.end_pos[0] == 11
+
+    monkeypatch.setattr(cache, 'parser_cache', {})
+    monkeypatch.setattr(settings, 'parser_cache_size', 45)
+    cache.save_parser(None, '/project/current.py', parser, pickling=False)
+    for name in 'abc':
+        cache.save_parser(None, '/lib/%s.py' % name, parser)
+    assert cache.load_parser(None, '/lib/a.py') is parser
+    cache.save_parser(None, '/lib/d.py', parser)
+
+    assert sorted(cache.parser_cache) == ['/lib/a.py', '/lib/d.py',
+                                          '/project/current.py']
+    assert cache.load_parser(None, '/lib/b.py') is not None
+    assert '/lib/b.py' in cache.parser_cache
 
-    cache._star_import_cache = {}  # first empty...
-    # path needs to be not-None (otherwise caching effects are not visible)
-    jedi.Script('', 1, 0, '').completions()
-    time.sleep(2 * new)
-    jedi.Script('', 1, 0, '').completions()
+    # Another module becomes the current one, the old one isn't pinned.
+    cache.save_parser(None, '/other/current.py', parser, pickling=False)
+    cache.save_parser(None, '/lib/e.py', parser)
+    assert '/project/current.py' not in cache.parser_cache
+    assert '/other/current.py' in cache.parser_cache
 
-    # reset values
-    jedi.settings.star_import_cache_validity = old
-    length = len(cache._star_import_cache)
-    cache._star_import_cache = {}
-    assert length == 1
+
+@pytest.mark.usefixtures("isolated_jedi_cache")
+def test_star_import_cache_removed_modules(monkeypatch, tmpdir):
+    """
+    The star imports of a module are forgotten, when its parser is replaced
+    or removed from the parser cache.
+    """
+    tmpdir.join('star_b.py').write('from star_c import *\n')
+    tmpdir.join('star_c.py').write('y = 1\n')
+    b_path = str(tmpdir.join('star_b.py'))
+
+    def star_importing_module():
+        path = str(tmpdir.join('star_a.py'))
+        jedi.Script('from star_b import *\ny', 2, 1, path).goto_assignments()
+        module = cache.parser_cache[b_path].parser.module
+        assert module in cache._star_import_cache
+        return module
+
+    module = star_importing_module()
+    cache.save_parser(b_path, None, Parser(u('from star_c import *\n'), b_path))
+    assert module not in cache._star_import_cache
+
+    module = star_importing_module()
+    monkeypatch.setattr(cache, '_current_directory', None)
+    monkeypatch.setattr(settings, 'parser_cache_size', 0)
+    cache._shrink_parser_cache()
+    assert b_path not in cache.parser_cache
+    assert module not in cache._star_import_cache
 
 
 def test_cache_call_signatures():
@@ -104,3 +292,126 @@ def test_cache_call_signatures():
 def test_cache_line_split_issues():
     """Should still work even if there's a newline."""
     assert jedi.Script('int(\n').call_signatures()[0].name == 'int'
+
+
+@pytest.mark.usefixtures("isolated_jedi_cache")
+def test_persistent_evaluator_cache(monkeypatch, tmpdir):
+    """
+    Results are kept between requests, until a module they used changes.
+    """
+    from jedi.evaluate import Evaluator
+    monkeypatch.setattr(settings, 'persistent_evaluator_cache', True)
+    monkeypatch.setattr(Evaluator, '_persistent', None)
+    monkeypatch.setattr(cache, 'parser_cache_listeners', [])
+    mod = tmpdir.join('mod.py')
+    mod.write('def f():\n    return 1\n')
+    source = 'import mod\nmod.f().'
+    path = str(tmpdir.join('main.py'))
+
+    def names():
+        script = jedi.Script(source, 2, len('mod.f().'), path)
+        return [c.name for c in script.completions()]
+
+    assert 'real' in names()
+    memoize_cache = Evaluator.persistent().memoize_cache
+    assert any(memoize_cache.values())
+    assert 'real' in names()
+    assert Evaluator.persistent().memoize_cache is memoize_cache
+
+    mod.write('def f():\n    return ""\n')
+    mod.setmtime(mod.mtime() + 10)
+    completions = names()
+    assert 'upper' in completions and 'real' not in completions
+
+
+def test_memoize_statistics(monkeypatch):
+    monkeypatch.setattr(settings, 'memoize_statistics', True)
+    script = jedi.Script('import json\nx = json.dumps(1)\nx.')
+    assert 'upper' in [c.name for c in script.completions()]
+    statistics = script._evaluator.memoize_cache.statistics
+    assert all(misses for hits, misses in statistics.values())
+    assert sum(hits for hits, misses in statistics.values())
+
+
+@pytest.mark.usefixtures("isolated_jedi_cache")
+def test_compiled_snapshots(monkeypatch):
+    """ The next process completes compiled modules without importing them. """
+    monkeypatch.setattr(settings, 'compiled_introspection_processes', 1)
+    monkeypatch.setattr(introspection, 'modules', {})
+    try:
+        compiled.load_module(None, 'math')
+    finally:
+        introspection._pool.shutdown()
+
+    introspection.modules.clear()
+    monkeypatch.setattr(introspection._pool, 'get', lambda: None)
+    module = compiled.load_module(None, 'math')
+    assert module.obj is not math
+    cos = module.get_subscope_by_name('cos')
+    assert cos._parse_function_doc() \
+        == compiled._parse_function_doc(inspect.getdoc(math.cos))
+
+
+@pytest.mark.usefixtures("isolated_jedi_cache")
+def test_fake_modules_are_pickled(monkeypatch):
+    from jedi.evaluate.compiled import fake
+    from jedi._compatibility import builtins
+    monkeypatch.setattr(fake, 'modules', {})
+    monkeypatch.setattr(cache, 'parser_cache', {})
+    assert fake._load_faked_module(builtins) is not None
+
+    def parse(*args):
+        raise AssertionError('The fake module is parsed again.')
+
+    # Another process loads the pickled module.
+    fake.modules.clear()
+    cache.parser_cache.clear()
+    monkeypatch.setattr(fake, 'Parser', parse)
+    module = fake._load_faked_module(builtins)
+    assert fake.search_scope(module, 'str') is not None
+
+
+@pytest.mark.usefixtures("isolated_jedi_cache")
+def test_star_import_cache_invalidation(tmpdir):
+    """
+    Star imports are cached until one of the star imported modules is parsed
+    again.
+    """
+    tmpdir.join('star_b.py').write('from star_c import *\n')
+    c_path = str(tmpdir.join('star_c.py'))
+    with open(c_path, 'w') as f:
+        f.write('y = 1\n')
+    path = str(tmpdir.join('star_a.py'))
+
+    def definitions():
+        script = jedi.Script('from star_b import *\ny', 2, 1, path)
+        return [d.module_path for d in script.goto_assignments()]
+
+    assert definitions() == [c_path]
+    b_module = cache.parser_cache[str(tmpdir.join('star_b.py'))].parser.module
+    star_imports = cache._star_import_cache[b_module]
+    definitions()
+    assert cache._star_import_cache[b_module] is star_imports
+
+    cache.save_parser(c_path, None, Parser(u('y = 2\n'), c_path))
+    assert b_module not in cache._star_import_cache
+
+
+def test_star_import_cache_changed_on_disk(tmpdir):
+    """
+    A module that is star imported indirectly is parsed again, if it changes
+    on disk.
+    """
+    tmpdir.join('star_b.py').write('from star_c import *\n')
+    c = tmpdir.join('star_c.py')
+    c.write('yyy_old = 1\n')
+    path = str(tmpdir.join('star_a.py'))
+
+    def completions():
+        script = jedi.Script('from star_b import *\nyyy_', 2, 4, path)
+        return [c.name for c in script.completions()]
+
+    assert completions() == ['yyy_old']
+    c.write('yyy_new = 1\n')
+    c.setmtime(c.mtime() + 10)
+    assert completions() == ['yyy_new']
@@ -1,6 +1,12 @@
+import math
+
+import pytest
+
 from jedi._compatibility import builtins
+from jedi import settings
 from jedi.parser.representation import Function
 from jedi.evaluate import compiled
+from jedi.evaluate.compiled import introspection
 from jedi.evaluate import Evaluator
 
 
@@ -47,3 +53,55 @@ def test_doc():
     """
     obj = compiled.CompiledObject(''.__getnewargs__)
     assert obj.doc == ''
+
+
+@pytest.mark.usefixtures("isolated_jedi_cache")
+def test_introspection_processes(monkeypatch, tmpdir):
+    """
+    Compiled modules are imported in worker processes, a module that crashes
+    or hangs while being imported doesn't take the evaluation down.
+    """
+    monkeypatch.setattr(settings, 'compiled_introspection_processes', 1)
+    monkeypatch.setattr(settings, 'compiled_introspection_timeout', 0.5)
+    monkeypatch.setattr(introspection, 'modules', {})
+
+    tmpdir.join('crashing.py').write('import os\nos._exit(1)\n')
+    tmpdir.join('hanging.py').write('import time\ntime.sleep(60)\n')
+    try:
+        crashing = compiled.load_module(str(tmpdir.join('crashing.py')), None)
+        hanging = compiled.load_module(str(tmpdir.join('hanging.py')), None)
+        module = compiled.load_module(None, 'math')
+    finally:
+        introspection._pool.shutdown()
+    assert 'os' not in [n.name for n in crashing.get_defined_names()]
+    assert 'time' not in [n.name for n in hanging.get_defined_names()]
+
+    assert module.obj is not math
+    cos = module.get_subscope_by_name('cos')
+    assert cos.type() == 'function'
+    assert len(cos.params) == 1
+    pi = module.get_subscope_by_name('pi')
+    assert pi.obj == math.pi
+
+
+@pytest.mark.usefixtures("isolated_jedi_cache")
+def test_introspection_shared_class(monkeypatch, tmpdir):
+    """
+    A class of a module that the worker imported for another module is
+    described again, the |jedi| process doesn't know that module.
+    """
+    monkeypatch.setattr(settings, 'compiled_introspection_processes', 1)
+    monkeypatch.setattr(introspection, 'modules', {})
+
+    tmpdir.join('moda.py').write('class Klass(object):\n'
+                                 '    def method(self):\n'
+                                 '        pass\n')
+    tmpdir.join('modb.py').write('from moda import Klass as Alias\n')
+    tmpdir.join('modc.py').write('import moda\n')
+    monkeypatch.syspath_prepend(str(tmpdir))
+    try:
+        compiled.load_module(str(tmpdir.join('modc.py')), None)
+        modb = compiled.load_module(str(tmpdir.join('modb.py')), None)
+    finally:
+        introspection._pool.shutdown()
+    assert 'method' in dir(modb.get_subscope_by_name('Alias').obj)
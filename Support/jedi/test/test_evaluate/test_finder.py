@@ -0,0 +1,28 @@
+from jedi._compatibility import u
+from jedi import cache
+from jedi.parser import Parser
+from jedi.evaluate import Evaluator
+from jedi.evaluate import finder
+
+
+def test_name_index():
+    """
+    The names of a parsed scope are looked up in an index, which is kept
+    until the module is parsed again.
+    """
+    module = Parser(u('a = 1\nb = 2\na = 3\n'), 'index_test.py').module
+    names = finder._get_defined_names_for_position(Evaluator(), module)
+    assert [n.start_pos for n in names.lookup('a')] == [(1, 0), (3, 0)]
+    assert names.lookup('c') == []
+    assert finder._get_defined_names_for_position(Evaluator(), module) is names
+
+    before = finder._get_defined_names_for_position(Evaluator(), module, (2, 0))
+    assert [n.start_pos for n in before.lookup('a')] == [(1, 0)]
+    # A lookup doesn't filter all the names of the scope.
+    assert before._list is None
+    assert list(before) == [n for n in names if n.start_pos < (2, 0)]
+
+    cache.save_parser(None, 'index_test.py', Parser(u(''), 'index_test.py'),
+                      pickling=False)
+    assert finder._get_defined_names_for_position(Evaluator(), module) is not names
+    del cache.parser_cache['index_test.py']
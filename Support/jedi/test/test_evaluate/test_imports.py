@@ -23,3 +23,115 @@ def test_import_not_in_sys_path():
     assert a[0].name == 'str'
     a = jedi.Script(path='module.py', line=7).goto_definitions()
     assert a[0].name == 'str'
+
+
+@pytest.mark.usefixtures("isolated_jedi_cache")
+def test_parallel_module_parsing(monkeypatch, tmpdir):
+    """
+    Other modules are parsed in worker processes and loaded from the cache.
+    """
+    from jedi import settings
+    monkeypatch.setattr(settings, 'parallel_module_parsing', 2)
+    for i in range(4):
+        tmpdir.join('user%s.py' % i).write('import main\nmain.foo\n')
+    tmpdir.join('other.py').write('x = 1\n')
+    main = tmpdir.join('main.py')
+    main.write('def foo():\n    pass\n')
+
+    usages = jedi.Script(main.read(), 1, 5, str(main)).usages()
+    assert sorted(u.module_name for u in usages) \
+        == ['main', 'user0', 'user1', 'user2', 'user3']
+
+    # The workers are used again for the next search.
+    from jedi.evaluate import imports
+    executor = imports._parser_pool.get()
+    for i in range(4):
+        user = tmpdir.join('user%s.py' % i)
+        user.write('import main\n\nmain.foo\n')
+        user.setmtime(user.mtime() + 10)
+    jedi.cache.clear_caches(delete_all=True)
+    usages = jedi.Script(main.read(), 1, 5, str(main)).usages()
+    assert [u.line for u in usages if u.module_name == 'user0'] == [3]
+    assert imports._parser_pool.get() is executor
+
+
+@pytest.mark.usefixtures("isolated_jedi_cache")
+def test_parallel_module_parsing_stops(monkeypatch, tmpdir):
+    """
+    The modules are yielded while the workers parse the others, the rest is
+    cancelled when the search stops.
+    """
+    from jedi import settings
+    from jedi.evaluate import imports
+    monkeypatch.setattr(settings, 'parallel_module_parsing', 2)
+    # Parsing takes long enough that the workers can't finish all of them.
+    functions = ''.join('def f%d(a):\n    return a\n' % i for i in range(500))
+    for i in range(40):
+        tmpdir.join('user%02d.py' % i).write('import main\nmain.foo\n'
+                                             + functions)
+    main = tmpdir.join('main.py')
+    main.write('def foo():\n    pass\n')
+
+    started = []
+
+    def parse_in_parallel(paths, name):
+        futures = parse_original(paths, name)
+        started.extend(futures.values())
+        return futures
+
+    parse_original = imports._parse_modules_in_parallel
+    monkeypatch.setattr(imports, '_parse_modules_in_parallel',
+                        parse_in_parallel)
+    script = jedi.Script(main.read(), 1, 5, str(main))
+    module = script._parser.module()
+    modules = imports.get_modules_containing_name(script._evaluator,
+                                                  [module], 'foo')
+    assert next(modules) is module
+    assert next(modules).path == str(tmpdir.join('user00.py'))
+    modules.close()
+    assert len(started) == 40
+    assert any(future.cancelled() for future in started)
+
+
+def test_find_module_cache(monkeypatch, tmpdir):
+    """
+    Modules are found without searching the directories again, unless
+    their contents changed.
+    """
+    from jedi.evaluate import imports
+    calls = []
+
+    def find_module(string, path=None):
+        calls.append(string)
+        return find_module_original(string, path)
+
+    find_module_original = imports.find_module
+    monkeypatch.setattr(imports, 'find_module', find_module)
+    first, second = tmpdir.mkdir('first'), tmpdir.mkdir('second')
+    second.join('cached_module.py').write('')
+    search_path = [str(first), str(second)]
+
+    def find():
+        module_file, path, is_package = \
+            imports._find_module_cached('cached_module', search_path)
+        module_file.close()
+        return path
+
+    assert find() == str(second.join('cached_module.py'))
+    assert find() == str(second.join('cached_module.py'))
+    assert len(calls) == 1
+
+    first.join('cached_module.py').write('')
+    assert find() == str(first.join('cached_module.py'))
+    assert len(calls) == 2
+
+
+def test_get_module_names(tmpdir):
+    from jedi.evaluate import imports
+    tmpdir.join('mod.py').write('')
+    tmpdir.mkdir('pkg').join('__init__.py').write('')
+    assert sorted(imports.get_module_names([str(tmpdir)])) == ['mod', 'pkg']
+
+    tmpdir.join('other.py').write('')
+    assert sorted(imports.get_module_names([str(tmpdir)])) \
+        == ['mod', 'other', 'pkg']
@@ -0,0 +1,29 @@
+from textwrap import dedent
+
+from jedi import Script
+from jedi import settings
+
+
+def test_statement_recursion():
+    script = Script(dedent('''
+        def f(a):
+            return f(a) or 1
+        f(1)'''))
+    assert [d.name for d in script.goto_definitions()] == ['int']
+    detector = script._evaluator.recursion_detector
+    assert detector.trips == 1
+    assert detector.current is None and detector._counts == {}
+
+
+def test_execution_limit(monkeypatch):
+    monkeypatch.setattr(settings, 'max_executions', 1)
+    script = Script(dedent('''
+        def f():
+            return 1
+        def g():
+            return f()
+        g()'''))
+    assert script.goto_definitions() == []
+    detector = script._evaluator.execution_recursion_detector
+    assert detector.trips == {'max_executions': 1}
+    assert detector.parent_execution_funcs == [] and detector._parent_counts == {}
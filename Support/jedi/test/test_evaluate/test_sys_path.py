@@ -0,0 +1,58 @@
+from jedi._compatibility import u
+from jedi.parser import Parser
+from jedi.evaluate import sys_path
+
+
+def test_sys_path_with_modifications_cache(monkeypatch, tmpdir):
+    calls = []
+    original = sys_path._sys_path_with_modifications
+
+    def counting(module):
+        calls.append(module)
+        return original(module)
+
+    monkeypatch.setattr(sys_path, '_sys_path_with_modifications', counting)
+    path = tmpdir.join('module.py')
+    path.write('')
+
+    def modifications(source):
+        module = Parser(u(source), str(path)).module
+        return sys_path.sys_path_with_modifications(module)
+
+    source = 'import sys\nsys.path.append("foo")\n'
+    first = modifications(source)
+    assert tmpdir.join('foo').strpath in first
+    assert modifications(source) == first
+    assert len(calls) == 1
+
+    first = modifications('import sys\nsys.path.append("bar")\n')
+    assert tmpdir.join('bar').strpath in first
+    assert len(calls) == 2
+
+    # A new Django project above the module is found when it changes.
+    tmpdir.join('manage.py').write('')
+    def search(path):
+        raise AssertionError('Django is searched on a cache hit.')
+
+    monkeypatch.setattr(sys_path, '_detect_django_path', search)
+    assert modifications('import sys\nsys.path.append("bar")\n') == first
+    assert len(calls) == 2
+    monkeypatch.undo()
+    path.setmtime(path.mtime() + 10)
+    assert modifications('import sys\nsys.path.append("bar")\n') \
+        == first + [tmpdir.strpath]
+
+
+def test_sys_path_with_modifications_lazy(tmpdir):
+    """ The cache key doesn't parse lazy function bodies. """
+    path = tmpdir.join('module.py')
+    path.write('')
+    source = u('def f():\n    import sys\n    sys.path.append("foo")\n')
+    module = Parser(source, str(path), lazy_bodies=True).module
+    assert tmpdir.join('foo').strpath in \
+        sys_path.sys_path_with_modifications(module)
+
+    module = Parser(source, str(path), lazy_bodies=True).module
+    assert tmpdir.join('foo').strpath in \
+        sys_path.sys_path_with_modifications(module)
+    assert 'path' in module.used_names.lazy
@@ -1,3 +1,5 @@
+import pytest
+
 import jedi
 
 def test_add_to_end():
@@ -35,3 +37,117 @@ def test_class_in_docstr():
 
     b = a + '\nimport os'
     assert jedi.Script(b, 4, 8).goto_assignments()
+
+
+def test_update_edits():
+    """
+    Updating with edits has to end up with the same module as parsing the
+    new source from scratch.
+    """
+    from jedi.parser.fast import FastParser
+
+    source = '\n'.join([
+        'import os',
+        '',
+        'class Abc():',
+        '    def abc(self):',
+        '        self.x = 3',
+        '',
+        '@property',
+        'def f(a):',
+        '    return a',
+        '',
+        'def g():',
+        '    pass',
+        '',
+    ])
+    edits = [
+        (5, 5, '        self.y = 4'),
+        (10, 9, 'class Two(Abc):\n    pass\n'),
+        (1, 1, ''),
+        (6, 6, ''),
+        (12, 12, 'def h():'),
+    ]
+    p = FastParser(source)
+    lines = source.splitlines()
+    for start, end, text in edits:
+        p.update_edits([(start, end, text)])
+        lines[start - 1:end] = text.splitlines()
+        new = FastParser('\n'.join(lines) + '\n')
+        assert p._parts == new._parts
+        assert p.module.get_code() == new.module.get_code()
+        assert [s.start_pos for s in p.module.subscopes] \
+            == [s.start_pos for s in new.module.subscopes]
+
+
+def test_update_edits_moves_parsers():
+    """
+    The parsers of the parts in front of and after an edit are kept, the ones
+    after it are just moved.
+    """
+    from jedi.parser.fast import FastParser
+
+    source = '\n'.join([
+        'def f():',
+        '    return 1',
+        '',
+        'def g(a):',
+        '    return a',
+        '',
+        'def h(b):',
+        '    x = g(b)',
+        '',
+    ])
+    p = FastParser(source)
+    f, g, h = p.parsers[1:]
+    p.update_edits([(5, 4, '    a += 1\n    a *= 2')])
+    assert p.parsers[1] is f and p.parsers[2] is not g and p.parsers[3] is h
+    func = p.module.subscopes[2]
+    assert func.start_pos == (9, 0)
+    assert func.statements[0].start_pos == (10, 4)
+    assert func.statements[0].end_pos == (10, 12)
+
+
+def test_statement_for_position_after_update():
+    """
+    The parsers that are reused by an update are moved, the positions of
+    their statements change.
+    """
+    from jedi.parser.fast import FastParser
+    from jedi.parser import representation as pr
+
+    source = '\n'.join([
+        '',
+        'def f(a):',
+        '    if a:',
+        '        return a',
+        '    else:',
+        '        raise ValueError(a)',
+        '    x = 3',
+        '',
+    ])
+    p = FastParser(source)
+    p.update('\n\n' + source)
+    module = p.module
+    stmt = module.get_statement_for_position((8, 12))
+    assert isinstance(stmt, pr.KeywordStatement)
+    assert stmt.name == 'raise' and stmt.start_pos == (8, 8)
+    assert module.get_statement_for_position((9, 4)).get_code() == 'x = 3\n'
+    assert module.get_statement_for_position((4, 1)) is None
+    assert module.get_scope_for_position((6, 10)).command == 'if'
+    assert module.get_scope_for_position((4, 10)) is module.subscopes[0]
+
+
+def test_update_edits_rejected():
+    """ A rejected batch of edits must not change the parser. """
+    from jedi.parser.fast import FastParser
+
+    source = 'def f():\n    pass\n\ndef g():\n    pass\n\ndef k():\n    pass\n'
+    p = FastParser(source)
+    with pytest.raises(ValueError):
+        p.update_edits([(1, 0, 'import os\nimport sys\nimport re'),
+                        (100, 100, 'x')])
+    p.update_edits([(8, 8, '    return 4')])
+    new = FastParser(source[:-len('pass\n')] + 'return 4\n')
+    assert p.module.get_code() == new.module.get_code()
+    assert [str(s.name) for s in p.module.subscopes] == ['f', 'g', 'k']
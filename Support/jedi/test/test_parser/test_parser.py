@@ -108,3 +108,84 @@ def test_end_pos():
     scope = parser.module.subscopes[0]
     assert scope.start_pos == (3, 0)
     assert scope.end_pos == (5, 0)
+
+
+def test_lazy_bodies():
+    s = u(dedent('''
+                 class A():
+                     def method(self, a):
+                         """doc"""
+                         def inner():
+                             return a
+                         yield inner
+
+                 def func(x=3):
+                     global y
+                     y = x
+                 '''))
+    eager = Parser(s).module
+    lazy = Parser(s, lazy_bodies=True).module
+    method = lazy.subscopes[0].subscopes[0]
+    assert isinstance(method, pr.LazyFunction)
+    assert isinstance(lazy.subscopes[1], pr.Function)  # because of `global`
+
+    assert 'a' in lazy.used_names
+    assert not isinstance(method, pr.LazyFunction)
+    assert method.raw_doc == 'doc'
+    assert method.is_generator
+    inner = method.subscopes[0]
+    assert inner.parent is method
+    assert (inner.start_pos, inner.end_pos) == ((5, 8), (7, 8))
+    assert method.end_pos == eager.subscopes[0].subscopes[0].end_pos
+
+    def used_names(module):
+        return sorted((k, sorted(s.start_pos for s in v))
+                      for k, v in module.used_names.items())
+    assert used_names(lazy) == used_names(eager)
+    assert [str(v) for v in lazy.global_vars] == ['y']
+
+
+def test_called_names():
+    s = u(dedent('''
+                 a.foo(1)
+                 foo
+                 x = [bar (2), baz]
+
+                 def func():
+                     return foo(qux)
+                 '''))
+
+    def called_names(module):
+        return sorted((k, sorted(s.start_pos for s in v))
+                      for k, v in module.called_names.items())
+    assert called_names(Parser(s).module) == [('bar', [(4, 0)]),
+                                              ('foo', [(2, 0), (7, 4)])]
+    lazy = Parser(s, lazy_bodies=True).module
+    assert 'foo' in lazy.called_names
+    assert called_names(lazy) == called_names(Parser(s).module)
+
+
+def test_mutations():
+    s = u(dedent('''
+                 a.b.append(1)
+                 x().append(2)
+                 c.add(d.add(3))
+
+                 def func():
+                     self.x.extend([])
+                 '''))
+
+    def mutations(module):
+        return sorted((k, r, sorted(s.start_pos for s in v))
+                      for k, receivers in module.mutations.items()
+                      for r, v in receivers.items())
+    assert mutations(Parser(s).module) == [
+        ('add', ('c',), [(4, 0)]),
+        ('add', ('d',), [(4, 0)]),
+        ('append', (), [(3, 0)]),
+        ('append', ('a', 'b'), [(2, 0)]),
+        ('extend', ('self', 'x'), [(7, 4)]),
+    ]
+    lazy = Parser(s, lazy_bodies=True).module
+    assert 'extend' in lazy.mutations
+    assert mutations(lazy) == mutations(Parser(s).module)
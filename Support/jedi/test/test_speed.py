@@ -8,6 +8,7 @@ import functools
 
 from .helpers import TestCase, cwd_at
 import jedi
+from jedi.parser.fast import FastParser
 
 class TestSpeed(TestCase):
     def _check_speed(time_per_run, number=4, run_warm=True):
@@ -51,3 +52,28 @@ class TestSpeed(TestCase):
         with open('speed/precedence.py') as f:
             line = len(f.read().splitlines())
         assert jedi.Script(line=line, path='speed/precedence.py').goto_definitions()
+
+    def test_fast_parser_edits(self):
+        """
+        An edit in a module that is twenty times as big shouldn't take much
+        longer, only the parts around it are parsed again.
+        """
+        def edit_time(functions):
+            lines = []
+            for i in range(functions):
+                lines += ['def f%d(a):' % i, '    x = a', '    return x', '']
+            parser = FastParser('\n'.join(lines))
+            line = functions * 2 + 2  # `x = a` in the middle of the module
+            times = []
+            for i in range(10):
+                first = time.time()
+                parser.update_edits([(line, line, '    x = a + %d' % i)])
+                parser.update_edits([(line, line - 1, '    y = a')])
+                parser.update_edits([(line, line, '')])
+                times.append(time.time() - first)
+            assert parser.module.subscopes[functions // 2].statements
+            return min(times)
+
+        small, big = edit_time(250), edit_time(5000)
+        print('\nspeed', small, big)
+        assert big < 3 * small
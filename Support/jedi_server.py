@@ -0,0 +1,263 @@
+# coding: utf-8
+""" A long-lived jedi process
+
+Every TextMate command used to start a fresh interpreter, import jedi and
+rebuild all of its caches. This module keeps one process around that owns the
+jedi runtime, so parsed modules and the builtin module stay warm between
+keystrokes. It listens on a per-user Unix socket, is spawned by the client on
+first use and exits by itself after `IDLE_TIMEOUT` seconds without requests.
+There is one server per environment (see `_environment_key`), because the
+server imports and caches modules with the environment it was started with.
+
+The protocol is one JSON request per connection. The client writes the request,
+shuts down its side of the socket and reads one JSON reply.
+
+"""
+import os
+import sys
+import json
+import errno
+import hashlib
+import socket
+import tempfile
+import time
+import subprocess
+
+support_path = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(support_path, 'jedi'))
+
+IDLE_TIMEOUT = float(os.environ.get('TM_JEDI_IDLE_TIMEOUT', 30 * 60))
+""" Seconds without a request after which the server shuts itself down. """
+
+CLEANUP_DELAY = 10.0
+""" Seconds without a request after which old modules are removed from the
+filesystem cache (at most once per `CLEANUP_INTERVAL`). """
+
+CLEANUP_INTERVAL = 60 * 60.0
+
+CONNECT_TIMEOUT = 10.0
+""" Seconds the client waits for a reply before giving up on the server. """
+
+EVALUATION_TIMEOUT = float(os.environ.get('TM_JEDI_EVALUATION_TIMEOUT', 1.0))
+""" Seconds after which completions and call signatures return what they have. """
+
+
+def _project_directory():
+    return os.environ.get('TM_PROJECT_DIRECTORY') or os.getcwd()
+
+
+def _environment_key():
+    """ Everything that changes which modules the server finds. """
+    key = [sys.executable, os.environ.get('VIRTUAL_ENV', ''),
+           os.environ.get('PYTHONPATH', ''), _project_directory()]
+    return hashlib.sha1('\0'.join(key).encode('utf-8')).hexdigest()[:16]
+
+
+socket_path = os.path.join(tempfile.gettempdir(), 'python-jedi-tmbundle-%s-%s.sock'
+                           % (os.getuid(), _environment_key()))
+
+
+class NotFoundError(Exception):
+    """ Raised on the client side, when jedi raised its NotFoundError. """
+
+
+def _script(request):
+    import jedi
+    return jedi.Script(request['source'], request['line'], request['column'],
+                       request.get('path'), encoding=request.get('encoding') or 'utf-8')
+
+
+def _completions(script):
+    return [c.name for c in script.completions(timeout=EVALUATION_TIMEOUT)]
+
+
+def _call_signatures(script):
+    return [{'call_name': s.call_name,
+             'params': [p.get_code().replace('\n', '') for p in s.params if p]}
+            for s in script.call_signatures(timeout=EVALUATION_TIMEOUT)]
+
+
+def _goto_definitions(script):
+    return [{'module_path': d.module_path,
+             'line': d.line,
+             'column': d.column,
+             'in_builtin_module': d.in_builtin_module()}
+            for d in script.goto_definitions()]
+
+
+def _docstrings(script):
+    return [{'desc_with_module': d.desc_with_module,
+             'doc': d.doc,
+             'repr': repr(d)}
+            for d in script.goto_definitions()]
+
+
+_commands = {
+    'completions': _completions,
+    'call_signatures': _call_signatures,
+    'goto_definitions': _goto_definitions,
+    'docstrings': _docstrings,
+}
+
+
+def handle_request(request):
+    """ Run one request against jedi and return a JSON serializable reply.
+
+    This is used by the server, but also by the client directly if the server
+    cannot be reached.
+    """
+    import jedi
+    jedi.settings.case_insensitive_completion = False
+    jedi.settings.add_bracket_after_function = True
+    try:
+        script = _script(request)
+        return {'result': _commands[request['command']](script)}
+    except jedi.NotFoundError:
+        return {'error': 'NotFoundError'}
+    except (ValueError, KeyError) as e:
+        return {'error': repr(e)}
+
+
+def _read_all(conn):
+    chunks = []
+    while True:
+        data = conn.recv(65536)
+        if not data:
+            return b''.join(chunks)
+        chunks.append(data)
+
+
+def serve():
+    """ Listen on `socket_path` until nobody asked for `IDLE_TIMEOUT`. """
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        server.bind(socket_path)
+    except socket.error as e:
+        if e.errno != errno.EADDRINUSE or _server_alive():
+            # Somebody else won the race for starting the server.
+            return
+        # A stale socket from a server that crashed.
+        os.unlink(socket_path)
+        server.bind(socket_path)
+    server.listen(5)
+    server.settimeout(min(CLEANUP_DELAY, IDLE_TIMEOUT))
+
+    # Pay for the imports now instead of on the first request.
+    import jedi
+    from jedi import cache
+    from jedi.evaluate import imports, sys_path
+    jedi.settings.persistent_evaluator_cache = True
+    jedi.settings.compiled_introspection_processes = 1
+    jedi.preload_module('os', 'sys')
+    imports.get_module_names(sys_path.get_sys_path())
+
+    last_request = time.time()
+    last_cleanup = None
+    try:
+        while True:
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                now = time.time()
+                if now - last_request >= IDLE_TIMEOUT:
+                    break
+                if last_cleanup is None or now - last_cleanup >= CLEANUP_INTERVAL:
+                    cache.remove_old_modules()
+                    last_cleanup = now
+                continue
+            last_request = time.time()
+            try:
+                conn.settimeout(None)
+                request = json.loads(_read_all(conn).decode('utf-8'))
+                try:
+                    reply = handle_request(request)
+                except Exception as e:
+                    # Never let a jedi bug take the server down.
+                    reply = {'error': repr(e)}
+                conn.sendall(json.dumps(reply).encode('utf-8'))
+            except (socket.error, ValueError):
+                pass
+            finally:
+                conn.close()
+    finally:
+        server.close()
+        try:
+            os.unlink(socket_path)
+        except OSError:
+            pass
+
+
+def _server_alive():
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(socket_path)
+    except socket.error:
+        return False
+    finally:
+        client.close()
+    return True
+
+
+def _spawn_server():
+    """ Start the server detached, so that TextMate doesn't wait for it. It
+    gets the environment of this process, which is the one of its socket. """
+    with open(os.devnull, 'r+b') as devnull:
+        subprocess.Popen([sys.executable, os.path.abspath(__file__)],
+                         stdin=devnull, stdout=devnull, stderr=devnull,
+                         cwd=_project_directory(), close_fds=True,
+                         preexec_fn=os.setsid)
+
+
+def _send(request):
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.settimeout(CONNECT_TIMEOUT)
+    try:
+        client.connect(socket_path)
+        client.sendall(json.dumps(request).encode('utf-8'))
+        client.shutdown(socket.SHUT_WR)
+        return json.loads(_read_all(client).decode('utf-8'))
+    finally:
+        client.close()
+
+
+def request(command, source, line, column, path=None, encoding=None):
+    """ Send a request to the server, spawning it if necessary.
+
+    Falls back to running jedi in this process if the server cannot be
+    spawned or reached. Returns None if the server doesn't answer within
+    `CONNECT_TIMEOUT`, running the request again here would only make it
+    slower. Raises `NotFoundError` if jedi didn't find anything and returns
+    None on other errors.
+    """
+    req = {'command': command, 'source': source, 'line': line,
+           'column': column, 'path': path, 'encoding': encoding}
+    reply = None
+    try:
+        reply = _send(req)
+    except socket.timeout:
+        return None
+    except (socket.error, ValueError):
+        try:
+            _spawn_server()
+        except OSError:
+            pass
+        else:
+            for _ in range(50):
+                time.sleep(0.05)
+                try:
+                    reply = _send(req)
+                    break
+                except socket.timeout:
+                    return None
+                except (socket.error, ValueError):
+                    continue
+    if reply is None:
+        reply = handle_request(req)
+
+    if reply.get('error') == 'NotFoundError':
+        raise NotFoundError()
+    return reply.get('result')
+
+
+if __name__ == '__main__':
+    serve()